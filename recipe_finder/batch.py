@@ -0,0 +1,160 @@
+# batch.py
+
+import argparse
+import csv
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import core
+from config import PANTRY_RERANK
+
+
+def read_queries(path):
+    """
+    Lazily reads search queries from a JSONL or CSV file.
+
+    Each query has an "ingredients" field and optional "cuisine" and "diet"
+    fields; any other fields are passed through to the output.
+
+    Args:
+        path (str): Path to a .jsonl or .csv file, or "-" for JSONL on stdin.
+
+    Yields:
+        dict: One query per row.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield row
+        return
+
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logging.error(f"Skipping invalid JSON on line {line_number}: {e}")
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def run_query(query, details_per_query):
+    """
+    Runs one search and fetches nutrition for its top results.
+
+    Args:
+        query (dict): Query with ingredients, cuisine and diet.
+        details_per_query (int): Number of results to fetch details for.
+
+    Returns:
+        dict: The query, its results with nutrition, and an error message or None.
+    """
+    ingredients = query.get("ingredients")
+    if not ingredients:
+        return {"query": query, "results": [], "error": "missing ingredients"}
+
+    recipes = core.search_recipes(ingredients, query.get("cuisine") or None, query.get("diet") or None)
+    if recipes is None:
+        return {"query": query, "results": [], "error": "search failed"}
+    if PANTRY_RERANK:
+        recipes = core.rank_by_pantry(ingredients, recipes)
+
+    top = recipes.get("results", [])[:details_per_query]
+    details = core.get_recipe_details_bulk([recipe["id"] for recipe in top]) if top else {}
+
+    results = []
+    for recipe in top:
+        nutrition_df = core.analyze_nutrition(details.get(recipe["id"]))
+        results.append({
+            "id": recipe["id"],
+            "title": recipe.get("title"),
+            "pantryCoverage": recipe.get("pantryCoverage"),
+            "pantryMissing": recipe.get("pantryMissing"),
+            "nutrition": nutrition_df.to_dict("records") if nutrition_df is not None else None,
+        })
+    return {"query": query, "results": results, "error": None}
+
+
+def run_batch(queries, output, concurrency=8, details_per_query=3):
+    """
+    Runs queries concurrently and writes one JSON line per query as each completes.
+
+    At most ``2 * concurrency`` queries are in flight at once, so memory use
+    does not grow with the size of the input.
+
+    Args:
+        queries (iterable): Queries, e.g. from read_queries().
+        output (file): Text stream the JSONL results are written to.
+        concurrency (int): Number of queries run at the same time.
+        details_per_query (int): Number of results to fetch details for.
+
+    Returns:
+        dict: Counts of queries, recipes and errors, elapsed seconds and throughput.
+    """
+    stats = {"queries": 0, "recipes": 0, "errors": 0}
+    start = time.monotonic()
+    max_in_flight = 2 * concurrency
+
+    def write(future, query):
+        try:
+            record = future.result()
+        except Exception as e:
+            logging.error(f"Error running batch query: {e}")
+            record = {"query": query, "results": [], "error": str(e)}
+        stats["queries"] += 1
+        stats["recipes"] += len(record["results"])
+        if record["error"]:
+            stats["errors"] += 1
+        output.write(json.dumps(record, default=str) + "\n")
+        output.flush()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight = {}  # future -> query
+        for query in queries:
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(future, in_flight.pop(future))
+            in_flight[executor.submit(run_query, query, details_per_query)] = query
+        for future in wait(in_flight).done:
+            write(future, in_flight[future])
+
+    stats["elapsed"] = time.monotonic() - start
+    stats["queries_per_second"] = stats["queries"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="main.py batch",
+        description="Run recipe searches from a JSONL or CSV file and stream results as JSONL.")
+    parser.add_argument("input", help="JSONL or CSV file with ingredients/cuisine/diet columns, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output JSONL file (default: stdout)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="queries run at the same time")
+    parser.add_argument("-n", "--details", type=int, default=3,
+                        help="results per query to fetch nutrition for")
+    args = parser.parse_args(argv)
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        stats = run_batch(read_queries(args.input), output,
+                          concurrency=max(1, args.concurrency), details_per_query=args.details)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"{stats['queries']} queries, {stats['recipes']} recipes, {stats['errors']} errors "
+          f"in {stats['elapsed']:.1f}s ({stats['queries_per_second']:.2f} queries/s)", file=sys.stderr)
+    return 1 if stats["errors"] and stats["errors"] == stats["queries"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# bench_server.py
+
+import copy
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_fixtures")
+
+
+class StubSpoonacularServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the Spoonacular API used by the benchmarks.
+
+    Replays the recorded fixtures in bench_fixtures/ for complexSearch,
+    information, informationBulk and recipe image requests, after a
+    configurable artificial latency. Search results get ids derived from the
+    query, so distinct queries lead to distinct recipes.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.05, jitter=0.02):
+        """
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind; 0 picks a free port.
+            latency (float): Seconds added to every response.
+            jitter (float): Maximum extra random seconds added to every response.
+        """
+        super().__init__((host, port), _StubHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.request_count = 0
+        self.points_used = 0.0
+        self._count_lock = threading.Lock()
+        with open(os.path.join(FIXTURES_DIR, "complex_search.json"), encoding="utf-8") as f:
+            self.search_fixture = json.load(f)
+        with open(os.path.join(FIXTURES_DIR, "recipe_information.json"), encoding="utf-8") as f:
+            self.information_fixture = json.load(f)
+        with open(os.path.join(FIXTURES_DIR, "recipe_image.png"), "rb") as f:
+            self.image_bytes = f.read()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serves requests on a daemon thread and returns the server."""
+        threading.Thread(target=self.serve_forever, name="stub-spoonacular", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def charge(self, points):
+        with self._count_lock:
+            self.request_count += 1
+            self.points_used += points
+            return self.points_used
+
+    def search(self, query, offset, number, fill_ingredients=False):
+        titles = [result["title"] for result in self.search_fixture["results"]]
+        ingredients = [{"name": ingredient["name"]} for ingredient in self.information_fixture["extendedIngredients"]]
+        total = self.search_fixture["totalResults"]
+        base_id = 100000 + (zlib.crc32(query.lower().encode("utf-8")) % 9000) * 100
+        results = []
+        for position in range(offset, min(offset + number, total)):
+            recipe_id = base_id + position
+            result = {"id": recipe_id,
+                      "title": titles[position % len(titles)],
+                      "image": f"{self.base_url}/recipeImages/{recipe_id}-556x370.png",
+                      "imageType": "png"}
+            if fill_ingredients:
+                # A different subset of the fixture's ingredients for each recipe
+                result["missedIngredients"] = [ingredient for i, ingredient in enumerate(ingredients)
+                                               if (recipe_id >> (i % 8)) & 1 or i < 2]
+            results.append(result)
+        return {"results": results, "offset": offset, "number": number, "totalResults": total}
+
+    def information(self, recipe_id):
+        titles = [result["title"] for result in self.search_fixture["results"]]
+        details = copy.deepcopy(self.information_fixture)
+        details["id"] = recipe_id
+        details["title"] = titles[recipe_id % len(titles)]
+        details["image"] = f"{self.base_url}/recipeImages/{recipe_id}-556x370.png"
+        scale = 1 + (recipe_id % 7) / 10
+        for nutrient in details["nutrition"]["nutrients"]:
+            nutrient["amount"] = round(nutrient["amount"] * scale, 2)
+            nutrient["percentOfDailyNeeds"] = round(nutrient["percentOfDailyNeeds"] * scale, 2)
+        return details
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency + random.uniform(0, server.jitter))
+        url = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+
+        try:
+            if parts[:2] == ["recipes", "complexSearch"]:
+                body = server.search(params.get("query", ""), int(params.get("offset", 0)),
+                                     int(params.get("number", 10)),
+                                     params.get("fillIngredients") == "true")
+                self._send_json(body, points=1 + 0.01 * len(body["results"]))
+            elif parts[:2] == ["recipes", "informationBulk"]:
+                ids = [int(recipe_id) for recipe_id in params.get("ids", "").split(",") if recipe_id]
+                self._send_json([server.information(recipe_id) for recipe_id in ids],
+                                points=1 + 0.5 * max(0, len(ids) - 1))
+            elif len(parts) == 3 and parts[0] == "recipes" and parts[2] == "information":
+                self._send_json(server.information(int(parts[1])), points=1)
+            elif parts and parts[0] == "recipeImages":
+                self._send(200, server.image_bytes, "image/png")
+            else:
+                self._send_json({"status": "failure", "message": "Not found"}, status=404)
+        except (ValueError, IndexError):
+            self._send_json({"status": "failure", "message": "Bad request"}, status=400)
+
+    def _send_json(self, body, status=200, points=0):
+        headers = {}
+        if points:
+            used = self.server.charge(points)
+            headers = {"X-API-Quota-Request": f"{points:g}",
+                       "X-API-Quota-Used": f"{used:g}",
+                       "X-API-Quota-Left": f"{1e9 - used:g}"}
+        self._send(status, json.dumps(body).encode("utf-8"), "application/json", headers)
+
+    def _send(self, status, payload, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the local Spoonacular stand-in server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    args = parser.parse_args()
+    server = StubSpoonacularServer(port=args.port, latency=args.latency, jitter=args.jitter)
+    print(f"Serving fixtures at {server.base_url} (set BASE_URL in config.py to use it)")
+    server.serve_forever()
@@ -0,0 +1,241 @@
+# benchmark.py
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import config
+from bench_server import StubSpoonacularServer
+
+
+def summarize(seconds):
+    """
+    Summarizes a list of durations.
+
+    Args:
+        seconds (list): Durations in seconds.
+
+    Returns:
+        dict: Count, mean, min, max and p50/p95/p99 in milliseconds.
+    """
+    if not seconds:
+        return {"count": 0}
+    ordered = sorted(seconds)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "min_ms": ordered[0] * 1000,
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def bench_search(core, queries):
+    cold = [_timed(core.search_recipes, query)[0] for query in queries]
+    warm = [_timed(core.search_recipes, query)[0] for query in queries]
+    return {"cold": summarize(cold), "warm": summarize(warm)}
+
+
+def bench_detail_to_chart(core, viz, recipe_ids):
+    construction, chart = _timed(viz.NutritionChart, None)
+    construction += _timed(chart.update, None)[0]
+
+    def select(recipe_id):
+        details = core.get_recipe_details_with_nutrition(recipe_id)
+        chart.update(core.analyze_nutrition(details))  # update() redraws the canvas
+
+    cold = [_timed(select, recipe_id)[0] for recipe_id in recipe_ids]
+    warm = [_timed(select, recipe_id)[0] for recipe_id in recipe_ids]
+    chart_only = []
+    nutrition_df = core.analyze_nutrition(core.get_recipe_details_with_nutrition(recipe_ids[0]))
+    for _ in recipe_ids:
+        start = time.perf_counter()
+        chart.update(nutrition_df)
+        chart_only.append(time.perf_counter() - start)
+    return {"chart_construction_ms": construction * 1000, "cold": summarize(cold),
+            "warm": summarize(warm), "chart_update": summarize(chart_only)}
+
+
+def bench_memory(core, viz, recipe_ids, warmup=20):
+    chart = viz.NutritionChart(None)
+
+    def select(recipe_id):
+        chart.update(core.analyze_nutrition(core.get_recipe_details_with_nutrition(recipe_id)))
+
+    for recipe_id in recipe_ids[:warmup]:
+        select(recipe_id)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for recipe_id in recipe_ids:
+        select(recipe_id)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    growth = current - baseline
+    return {"selections": len(recipe_ids), "growth_bytes": growth,
+            "growth_per_selection_bytes": growth / len(recipe_ids) if recipe_ids else 0,
+            "peak_bytes": peak - baseline}
+
+
+def bench_recipe_parsing(models, payload, count=2000):
+    raw = json.dumps(payload)
+    parse = [_timed(models.Recipe.from_dict, json.loads(raw))[0] for _ in range(200)]
+
+    def retained(build):
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        kept = [build(dict(json.loads(raw), id=i)) for i in range(count)]
+        size = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+        del kept
+        return size / count
+
+    dict_bytes = retained(lambda details: details)
+    recipe_bytes = retained(models.Recipe.from_dict)
+    return {"parse": summarize(parse), "payload_bytes": len(raw),
+            "bytes_per_recipe_dict": dict_bytes, "bytes_per_recipe_model": recipe_bytes,
+            "reduction": dict_bytes / recipe_bytes if recipe_bytes else None}
+
+
+def bench_images(images_module, cache_dir, urls):
+    loader = images_module.ImageLoader(None, cache_dir, size=config.IMAGE_SIZE)
+    cold = [_timed(loader.load_sync, url)[0] for url in urls]
+    warm = [_timed(loader.load_sync, url)[0] for url in urls]
+    return {"cold": summarize(cold), "disk_cached": summarize(warm)}
+
+
+def bench_pantry_rerank(core, pantry, candidates=5000, repeats=20):
+    ingredient_names = ["chicken breast", "basmati rice", "onion", "tomato", "plain yogurt", "garlic",
+                        "ginger", "paprika", "turmeric", "vegetable oil", "cilantro", "salt", "butter",
+                        "lemon", "potato", "carrot", "beef", "pasta", "cheddar cheese", "egg"]
+    recipes = [{"id": i, "title": f"Recipe {i}",
+                "missedIngredients": [{"name": name} for j, name in enumerate(ingredient_names)
+                                      if (i * 2654435761 >> j) % 3 == 0]}
+               for i in range(candidates)]
+    timings = [_timed(pantry.rank_recipes, "chicken, rice, onion, garlic, tomato", recipes)[0]
+               for _ in range(repeats)]
+    matrix = pantry.IngredientMatrix([pantry.recipe_ingredients(recipe) for recipe in recipes])
+    scoring = [_timed(matrix.rank, ["chicken", "rice", "onion", "garlic", "tomato"])[0]
+               for _ in range(repeats)]
+    response = {"results": recipes[:config.SEARCH_PAGE_SIZE]}
+    page = [_timed(core.rank_by_pantry, "chicken, rice, onion", response)[0] for _ in range(repeats)]
+    return {"candidates": candidates, "rerank": summarize(timings), "encoded_scoring": summarize(scoring),
+            "search_page": summarize(page)}
+
+
+def bench_nutrition_store(core, repeats=20):
+    store = core.get_nutrition_store()
+    flush = _timed(store.flush)[0]
+    column = [_timed(lambda: float(store.column("Protein").sum()))[0] for _ in range(repeats)]
+    matrix = [_timed(store.to_matrix, ["Calories", "Protein", "Fat"])[0] for _ in range(repeats)]
+    return {"recipes": len(store), "nutrients": len(store.nutrients()), "flush_ms": flush * 1000,
+            "column_scan": summarize(column), "to_matrix_3_columns": summarize(matrix)}
+
+
+def bench_batch(batch_module, queries, concurrency):
+    with open(os.devnull, "w") as output:
+        stats = batch_module.run_batch(({"ingredients": query} for query in queries), output,
+                                       concurrency=concurrency, details_per_query=3)
+    return stats
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="recipe_finder_bench_")
+    # Registered before core is imported so it runs after the index's own exit hook
+    atexit.register(shutil.rmtree, workdir, True)
+    server = StubSpoonacularServer(latency=args.latency, jitter=args.jitter).start()
+
+    # Point the app at the stub server and a throwaway cache before importing
+    # the modules that read these settings at import time.
+    config.BASE_URL = server.base_url
+    config.API_KEY = "benchmark"
+    config.CACHE_PATH = os.path.join(workdir, "responses.sqlite3")
+    config.INDEX_PATH = os.path.join(workdir, "recipe_index.pickle")
+    config.IMAGE_CACHE_DIR = os.path.join(workdir, "images")
+    config.NUTRITION_STORE_PATH = os.path.join(workdir, "nutrition_store")
+    config.RATE_LIMIT_PER_SECOND = 1e6
+    config.RATE_LIMIT_BURST = 1e6
+    config.DAILY_POINTS = 1e12
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import core
+    import viz
+    import images
+    import batch
+    import metrics
+    import pantry
+    import models
+
+    try:
+        search_queries = [f"chicken,rice,spice{i}" for i in range(args.searches)]
+        recipe_ids = [200000 + i for i in range(args.selections)]
+        results = {
+            "search": bench_search(core, search_queries),
+            "detail_to_chart": bench_detail_to_chart(core, viz, recipe_ids[:args.searches]),
+            "memory": bench_memory(core, viz, recipe_ids),
+            "images": bench_images(images, config.IMAGE_CACHE_DIR,
+                                   [f"{server.base_url}/recipeImages/{recipe_id}-556x370.png"
+                                    for recipe_id in recipe_ids[:args.searches]]),
+            "recipe_parsing": bench_recipe_parsing(models, server.information(200000)),
+            "pantry_rerank": bench_pantry_rerank(core, pantry),
+            "nutrition_store": bench_nutrition_store(core),
+            "batch": bench_batch(batch, [f"batch query {i}" for i in range(args.batch_queries)],
+                                 args.concurrency),
+            "cache": core.get_cache_stats(),
+            "stages": metrics.snapshot(),
+        }
+    finally:
+        server.stop()
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {"python": sys.version.split()[0], "platform": platform.platform()},
+        "parameters": vars(args),
+        "server_requests": server.request_count,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark recipe_finder against a local Spoonacular stand-in server.")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds of latency per stub response")
+    parser.add_argument("--jitter", type=float, default=0.02, help="maximum extra random latency in seconds")
+    parser.add_argument("--searches", type=int, default=20, help="searches and detail views to time")
+    parser.add_argument("--selections", type=int, default=300, help="recipe selections for the memory run")
+    parser.add_argument("--batch-queries", type=int, default=100, help="queries in the batch run")
+    parser.add_argument("--concurrency", type=int, default=8, help="batch concurrency")
+    parser.add_argument("-o", "--output", default="-", help="JSON output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2, default=str)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+# cache.py
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+def make_key(kind, **params):
+    """
+    Builds a normalized cache key from a request kind and its parameters.
+
+    Ingredient lists are lowercased, stripped and sorted so that
+    "Rice, chicken" and "chicken,rice" share a cache entry. Empty filters
+    are dropped.
+
+    Args:
+        kind (str): Request kind, e.g. "search" or "details".
+        **params: Request parameters.
+
+    Returns:
+        str: The cache key.
+    """
+    parts = [kind]
+    for name in sorted(params):
+        value = params[name]
+        if value is None or value == "":
+            continue
+        if name == "ingredients":
+            items = [item.strip().lower() for item in str(value).split(",")]
+            value = ",".join(sorted(item for item in items if item))
+        else:
+            value = str(value).strip().lower()
+        parts.append(f"{name}={value}")
+    return "|".join(parts)
+
+
+class ResponseCache:
+    """
+    Persistent SQLite cache for API responses with TTL expiry, a size cap
+    and least-recently-used eviction.
+    """
+
+    def __init__(self, path, ttl, max_entries):
+        """
+        Args:
+            path (str): Location of the SQLite database file.
+            ttl (float): Seconds an entry stays valid.
+            max_entries (int): Maximum number of entries kept on disk.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, last_access REAL NOT NULL)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_access "
+                "ON responses (last_access)")
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Response cache disabled, could not open {path}: {e}")
+            self._conn = None
+
+    def get(self, key):
+        """
+        Returns the cached value for a key, or None if missing or expired.
+        """
+        if self._conn is None:
+            return None
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, created FROM responses WHERE key = ?",
+                    (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                value, created = row
+                if now - created > self.ttl:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self.misses += 1
+                    return None
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?",
+                    (now, key))
+                self._conn.commit()
+                self.hits += 1
+            return json.loads(value)
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            logging.error(f"Response cache read error: {e}")
+            return None
+
+    def set(self, key, value):
+        """
+        Stores a JSON-serializable value and evicts the least recently used
+        entries beyond the size cap.
+        """
+        if self._conn is None:
+            return
+        now = time.time()
+        try:
+            payload = json.dumps(value)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created, last_access) "
+                    "VALUES (?, ?, ?, ?)", (key, payload, now, now))
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY last_access DESC "
+                    "LIMIT -1 OFFSET ?)", (self.max_entries,))
+                self._conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logging.error(f"Response cache write error: {e}")
+
+    def clear(self):
+        """Removes every entry and resets the counters."""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hit/miss counters and the current number of entries.
+        """
+        entries = 0
+        if self._conn is not None:
+            with self._lock:
+                entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
@@ -0,0 +1,92 @@
+# coalesce.py
+
+import logging
+import threading
+from concurrent.futures import Future
+
+import ratelimit
+
+
+class RequestCoalescer:
+    """
+    Merges concurrent single-key lookups into batched calls.
+
+    The first lookup in a window starts a timer; every lookup arriving before
+    it fires joins the same batch, which is then resolved with one call to
+    ``fetch_many``. A batch is flushed early once it reaches ``max_batch``
+    keys, and duplicate keys share a single result. The batch is fetched at
+    the most urgent rate-limit priority of the threads that submitted to it,
+    since it runs on the timer thread rather than theirs.
+    """
+
+    def __init__(self, fetch_many, window=0.025, max_batch=50):
+        """
+        Args:
+            fetch_many (callable): Takes a list of keys and returns a dict
+                mapping keys to results. Missing keys resolve to None.
+            window (float): Seconds to wait for more keys before flushing.
+            max_batch (int): Maximum number of keys per batch.
+        """
+        self._fetch_many = fetch_many
+        self._window = window
+        self._max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._levels = {}  # key -> most urgent priority it was submitted at
+        self._timer = None
+
+    def get(self, key):
+        """
+        Returns the result for a single key, blocking until its batch is done.
+        """
+        return self.submit(key).result()
+
+    def submit(self, key):
+        """
+        Adds a key to the current batch.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the result for the key.
+        """
+        flush_now = None
+        level = ratelimit.current_priority()
+        with self._lock:
+            self._levels[key] = min(level, self._levels.get(key, level))
+            future = self._pending.get(key)
+            if future is None:
+                future = Future()
+                self._pending[key] = future
+                if len(self._pending) >= self._max_batch:
+                    flush_now = self._take_batch()
+                elif self._timer is None:
+                    self._timer = threading.Timer(self._window, self._flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if flush_now:
+            self._resolve(flush_now)
+        return future
+
+    def _take_batch(self):
+        batch = self._pending, self._levels
+        self._pending, self._levels = {}, {}
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _flush(self):
+        with self._lock:
+            batch = self._take_batch()
+        if batch[0]:
+            self._resolve(batch)
+
+    def _resolve(self, batch):
+        batch, levels = batch
+        try:
+            with ratelimit.priority(min(levels.values())):
+                results = self._fetch_many(list(batch)) or {}
+        except Exception as e:
+            logging.error(f"Error fetching batch of {len(batch)} keys: {e}")
+            results = {}
+        for key, future in batch.items():
+            future.set_result(results.get(key))
@@ -1,2 +1,90 @@
 API_KEY = "Your_Api_Key"
-BASE_URL = "https://api.spoonacular.com"
\ No newline at end of file
+BASE_URL = "https://api.spoonacular.com"
+
+# --- Response cache ---
+CACHE_PATH = "cache/responses.sqlite3"
+CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+CACHE_MAX_ENTRIES = 5000
+
+
+# --- HTTP client ---
+HTTP_CONNECT_TIMEOUT = 3.05  # seconds
+HTTP_READ_TIMEOUT = 15  # seconds
+HTTP_POOL_SIZE = 10
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_BASE = 0.5  # seconds
+HTTP_BACKOFF_MAX = 8  # seconds, also the longest Retry-After we will wait for
+
+
+# --- Prefetching ---
+PREFETCH_COUNT = 5  # top search results fetched ahead of a click
+
+
+# --- Bulk recipe details ---
+BULK_CHUNK_SIZE = 50  # recipe ids per informationBulk call
+BULK_COALESCE_WINDOW = 0.025  # seconds single-id requests wait to share a batch
+
+
+# --- Images ---
+IMAGE_CACHE_DIR = "cache/images"
+IMAGE_SIZE = (300, 200)
+IMAGE_MEMORY_CACHE_SIZE = 64  # thumbnails kept ready for display
+
+
+# --- Nutrition store (columnar, one file per nutrient) ---
+NUTRITION_STORE_PATH = "cache/nutrition_store"
+NUTRITION_STORE_FLUSH_ROWS = 64  # buffered recipes written together
+
+
+# --- Task scheduler ---
+SCHEDULER_WORKERS = 4
+SCHEDULER_BACKGROUND_WORKERS = 2  # workers that may run prefetches at once
+SCHEDULER_POLL_MS = 30  # how often the Tk loop collects finished tasks
+
+
+# --- Rate limiting (defaults match the free plan; raise them to match yours) ---
+RATE_LIMIT_PER_SECOND = 1
+RATE_LIMIT_BURST = 2
+DAILY_POINTS = 150
+QUOTA_REFRESH_MS = 1000  # status bar refresh of the remaining API points
+
+
+# --- Local recipe index ---
+INDEX_PATH = "cache/recipe_index.pickle"
+# "merge": append local matches to API results, "local_first": skip the API
+# when the index has LOCAL_SEARCH_MIN_RESULTS matches, "fallback": local
+# matches only when the API is unreachable.
+LOCAL_SEARCH_MODE = "merge"
+LOCAL_SEARCH_MIN_RESULTS = 5
+
+
+# --- Search paging ---
+SEARCH_PAGE_SIZE = 20  # results per complexSearch call (the API allows up to 100)
+SEARCH_MAX_RESULTS = 900  # the API rejects offsets beyond this
+SEARCH_LOAD_MORE_THRESHOLD = 0.9  # scroll position at which the next page is loaded
+
+
+# --- Pantry ranking ---
+PANTRY_RERANK = True  # order results by how much of the searched ingredients they use
+PANTRY_STAPLES = ["water", "salt", "pepper"]  # never counted as missing
+SEARCH_FILL_INGREDIENTS = True  # have complexSearch list each result's ingredients (costs a few more points)
+
+
+# --- Live search ---
+LIVE_SEARCH_DEBOUNCE_MS = 300  # typing pause before a live search is sent
+LIVE_SEARCH_MIN_CHARS = 3  # shorter queries are not sent to the API
+LIVE_SEARCH_CACHE_SIZE = 64  # recent responses kept for narrowing queries
+
+
+# --- Shared service (python main.py serve) ---
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8770
+# Set to e.g. "http://127.0.0.1:8770" to send API calls through a running
+# service instead of straight to Spoonacular; the service's own rate limiter
+# and quota then apply.
+SERVICE_URL = None
+
+
+# --- Instrumentation ---
+METRICS_ENABLED = True  # per-stage latency histograms; near-zero cost when off
+METRICS_DUMP_PATH = None  # e.g. "logs/metrics.json" to write a snapshot at exit
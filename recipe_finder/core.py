@@ -3,36 +3,180 @@
 import requests
 import json
 import logging
-import pandas as pd
-from config import API_KEY, BASE_URL
+import threading
+from config import (CACHE_PATH, CACHE_TTL, CACHE_MAX_ENTRIES,
+                    BULK_CHUNK_SIZE, BULK_COALESCE_WINDOW,
+                    INDEX_PATH, LOCAL_SEARCH_MODE, LOCAL_SEARCH_MIN_RESULTS,
+                    SEARCH_PAGE_SIZE, SEARCH_MAX_RESULTS,
+                    SEARCH_FILL_INGREDIENTS, PANTRY_STAPLES,
+                    NUTRITION_STORE_PATH, NUTRITION_STORE_FLUSH_ROWS)
+from cache import ResponseCache, make_key
+from coalesce import RequestCoalescer
+from index import RecipeIndex
+from models import Recipe, as_recipe
+import http_client
+import metrics
 
 logging.basicConfig(level=logging.INFO, filename='logs/app.log',
                     format='%(asctime)s - %(levelname)s - %(message)s')
 
+_response_cache = ResponseCache(CACHE_PATH, CACHE_TTL, CACHE_MAX_ENTRIES)
+_recipe_index = RecipeIndex(INDEX_PATH)
+_nutrition_store = None  # Created on first use; warehouse pulls in numpy
+_nutrition_store_lock = threading.Lock()
 
-def search_recipes(ingredients, cuisine=None, diet=None):
+
+def search_recipes(ingredients, cuisine=None, diet=None, offset=0, number=None):
     """
     Searches for recipes based on ingredients and filters.
 
+    Recipes already fetched are also looked up in the local index. Depending
+    on LOCAL_SEARCH_MODE, local matches are appended to the API results
+    ("merge"), returned without calling the API when there are enough of them
+    ("local_first"), or only used when the API is unreachable ("fallback").
+    Local matches only accompany the first page.
+
     Args:
         ingredients (str): Ingredients to search for.
         cuisine (str, optional): Cuisine type.
         diet (str, optional): Dietary restriction.
+        offset (int): Number of results to skip.
+        number (int, optional): Page size; the API default (10) if omitted.
 
     Returns:
         dict: API response as a dictionary, or None on error.
     """
+    if offset:
+        return _search_remote(ingredients, cuisine, diet, offset, number)
+
+    local_results = _recipe_index.search(ingredients, cuisine, diet)
+    if LOCAL_SEARCH_MODE == "local_first" and len(local_results) >= LOCAL_SEARCH_MIN_RESULTS:
+        return _local_response(local_results)
+
+    result = _search_remote(ingredients, cuisine, diet, offset, number)
+    if result is None:
+        return _local_response(local_results) if local_results else None
+
+    if LOCAL_SEARCH_MODE in ("merge", "local_first"):
+        results = result.setdefault('results', [])
+        seen = {recipe['id'] for recipe in results}
+        results.extend(recipe for recipe in local_results if recipe['id'] not in seen)
+    return result
+
+
+def iter_search_pages(ingredients, cuisine=None, diet=None, page_size=SEARCH_PAGE_SIZE,
+                      max_results=SEARCH_MAX_RESULTS):
+    """
+    Searches for recipes page by page.
+
+    Each page is fetched (and cached) only when the generator is advanced,
+    so callers can stop as soon as they have seen enough.
+
+    Args:
+        ingredients (str): Ingredients to search for.
+        cuisine (str, optional): Cuisine type.
+        diet (str, optional): Dietary restriction.
+        page_size (int): Results requested per page.
+        max_results (int): Offset at which to stop paging.
+
+    Yields:
+        dict: One search response per page, as returned by search_recipes.
+        Stops after the last page or on error.
+    """
+    offset = 0
+    while offset < max_results:
+        page = search_recipes(ingredients, cuisine, diet, offset=offset, number=page_size)
+        if not page or not page.get('results'):
+            return
+        yield page
+        offset += page_size
+        if offset >= page.get('totalResults', 0):
+            return
+
+
+def search_recipes_local(ingredients, cuisine=None, diet=None, limit=10):
+    """
+    Searches only the local index of previously fetched recipes.
+
+    Args:
+        ingredients (str): Ingredients to search for.
+        cuisine (str, optional): Cuisine type.
+        diet (str, optional): Dietary restriction.
+        limit (int): Maximum number of results.
+
+    Returns:
+        dict: Response shaped like the API search response.
+    """
+    return _local_response(_recipe_index.search(ingredients, cuisine, diet, limit=limit))
+
+
+def rank_by_pantry(ingredients, recipes):
+    """
+    Reorders a search response so recipes using most of the given
+    ingredients, and needing the fewest others, come first.
+
+    Ingredients come from the results themselves (see
+    SEARCH_FILL_INGREDIENTS) or from the local index for recipes fetched
+    before. PANTRY_STAPLES are never counted as missing.
+
+    Args:
+        ingredients (str): The ingredients at hand, comma-separated.
+        recipes (dict): Search response, e.g. from search_recipes.
+
+    Returns:
+        dict: A copy of the response with reranked results, each annotated
+        with pantryCoverage and pantryMissing when its ingredients are known.
+    """
+    if not recipes or not recipes.get('results'):
+        return recipes
+    from pantry import rank_recipes  # Deferred: numpy is only needed once results arrive
+
+    with metrics.span("core.rank_by_pantry"):
+        results = rank_recipes(ingredients, recipes['results'],
+                               ingredients_for=_recipe_index.ingredients, staples=PANTRY_STAPLES)
+    return dict(recipes, results=results)
+
+
+def recipe_words(recipe_id):
+    """
+    Returns:
+        frozenset: Normalized ingredient and title words of a previously
+        fetched recipe, or None if it hasn't been fetched.
+    """
+    return _recipe_index.words(recipe_id)
+
+
+def _local_response(results):
+    return {"results": results, "offset": 0, "number": len(results),
+            "totalResults": len(results), "source": "local"}
+
+
+def _search_remote(ingredients, cuisine, diet, offset=0, number=None):
+    cache_key = make_key("search", ingredients=ingredients, cuisine=cuisine, diet=diet,
+                         offset=offset or None, number=number)
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        logging.info(f"Cache hit: {cache_key}")
+        metrics.incr("cache.hits")
+        return cached
+    metrics.incr("cache.misses")
+
     try:
-        url = f"{BASE_URL}/recipes/complexSearch?apiKey={API_KEY}&query={ingredients}"
+        params = {"query": ingredients}
         if cuisine:
-            url += f"&cuisine={cuisine}"
+            params["cuisine"] = cuisine
         if diet:
-            url += f"&diet={diet.lower().replace(' ', '%20')}"
+            params["diet"] = diet.lower()
+        if offset:
+            params["offset"] = offset
+        if number:
+            params["number"] = number
+        if SEARCH_FILL_INGREDIENTS:
+            params["fillIngredients"] = "true"
 
-        logging.info(f"API request: {url}")
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
+        result = http_client.get_json("/recipes/complexSearch", params)
+        _response_cache.set(cache_key, result)
+        return result
 
     except requests.exceptions.RequestException as e:
         logging.error(f"API request error: {e}")
@@ -46,25 +190,142 @@ def get_recipe_details_with_nutrition(recipe_id):
     """
     Retrieves detailed information for a specific recipe, including comprehensive nutrition details.
 
+    Uncached lookups made at the same time from different threads are
+    coalesced into a single bulk request.
+
     Args:
         recipe_id (int): The ID of the recipe.
 
     Returns:
-        dict: API response with recipe details and detailed nutrition, or None on error.
+        models.Recipe: Recipe details and nutrition, or None on error.
     """
-    try:
-        url = f"{BASE_URL}/recipes/{recipe_id}/information?apiKey={API_KEY}&includeNutrition=true"  # Get detailed nutrition
-        logging.info(f"API request: {url}")
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
+    cache_key = make_key("details", id=recipe_id)
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        logging.info(f"Cache hit: {cache_key}")
+        metrics.incr("cache.hits")
+        recipe = _parse_recipe(cached)
+        if recipe_id not in _recipe_index:
+            _recipe_index.add(recipe)
+        get_nutrition_store().append(recipe)
+        return recipe
+    metrics.incr("cache.misses")
+
+    return _details_coalescer.get(recipe_id)
+
+
+def get_recipe_details_bulk(recipe_ids):
+    """
+    Retrieves details with nutrition for many recipes using batched requests.
+
+    Cached recipes are served locally; the rest are fetched in chunks of
+    BULK_CHUNK_SIZE ids, one API call per chunk.
+
+    Args:
+        recipe_ids (list): IDs of the recipes.
+
+    Returns:
+        dict: Mapping of recipe ID to models.Recipe. IDs that could not be
+        fetched are omitted.
+    """
+    results = {}
+    missing = []
+    for recipe_id in dict.fromkeys(recipe_ids):
+        cached = _response_cache.get(make_key("details", id=recipe_id))
+        if cached is not None:
+            recipe = results[recipe_id] = _parse_recipe(cached)
+            if recipe_id not in _recipe_index:
+                _recipe_index.add(recipe)
+            get_nutrition_store().append(recipe)
+        else:
+            missing.append(recipe_id)
+
+    for start in range(0, len(missing), BULK_CHUNK_SIZE):
+        results.update(_fetch_details_chunk(missing[start:start + BULK_CHUNK_SIZE]))
+    return results
+
+
+def _fetch_details_chunk(recipe_ids):
+    """
+    Fetches one chunk of recipe details with a single informationBulk call.
+
+    Args:
+        recipe_ids (list): IDs of the recipes, at most BULK_CHUNK_SIZE.
 
+    Returns:
+        dict: Mapping of recipe ID to models.Recipe, empty on error.
+    """
+    try:
+        payload = http_client.get_json("/recipes/informationBulk",
+                                       {"ids": ",".join(str(recipe_id) for recipe_id in recipe_ids),
+                                        "includeNutrition": "true"})
     except requests.exceptions.RequestException as e:
         logging.error(f"API request error: {e}")
-        return None
+        return {}
     except json.JSONDecodeError as e:
         logging.error(f"Error decoding JSON: {e}")
-        return None
+        return {}
+
+    results = {}
+    requested = {str(recipe_id): recipe_id for recipe_id in recipe_ids}
+    for details in payload or []:
+        recipe = _parse_recipe(details)
+        recipe_id = requested.get(str(recipe.id), recipe.id)
+        # Only the parsed fields are cached, not the whole payload
+        _response_cache.set(make_key("details", id=recipe_id), recipe.to_dict())
+        _recipe_index.add(recipe)
+        get_nutrition_store().append(recipe)
+        results[recipe_id] = recipe
+    return results
+
+
+def _parse_recipe(details):
+    with metrics.span("core.parse_recipe"):
+        return Recipe.from_dict(details)
+
+
+# Concurrent single-recipe lookups arriving within a short window share one bulk call.
+_details_coalescer = RequestCoalescer(_fetch_details_chunk, window=BULK_COALESCE_WINDOW,
+                                      max_batch=BULK_CHUNK_SIZE)
+
+
+def get_cache_stats():
+    """
+    Returns hit/miss counters and size of the response cache.
+
+    Returns:
+        dict: Cache statistics.
+    """
+    return _response_cache.stats()
+
+
+def get_quota_stats():
+    """
+    Returns the API rate limiter statistics.
+
+    Returns:
+        dict: Remaining and used daily points, queued requests and wait times.
+    """
+    return http_client.get_rate_limiter().stats()
+
+
+def get_nutrition_store():
+    """
+    Returns the columnar store holding the nutrition of every fetched recipe,
+    opening it on first use.
+
+    Returns:
+        warehouse.NutritionStore: The shared store; use column(), select(),
+        top_k() or to_matrix() to query it without re-fetching recipes.
+    """
+    global _nutrition_store
+    if _nutrition_store is None:
+        with _nutrition_store_lock:
+            if _nutrition_store is None:
+                from warehouse import NutritionStore  # Deferred: pulls in numpy
+                _nutrition_store = NutritionStore(NUTRITION_STORE_PATH,
+                                                  flush_rows=NUTRITION_STORE_FLUSH_ROWS)
+    return _nutrition_store
 
 
 def analyze_nutrition(recipe_details):
@@ -72,19 +333,29 @@ def analyze_nutrition(recipe_details):
     Analyzes the nutritional information from recipe details.
 
     Args:
-        recipe_details (dict): Recipe details from the API.
+        recipe_details (models.Recipe or dict): The recipe or its API details.
 
     Returns:
-        pandas.DataFrame: DataFrame with nutritional information, or None on error.
+        pandas.DataFrame: DataFrame with name, amount, unit and
+        percentOfDailyNeeds columns, or None on error.
     """
     try:
-        if not recipe_details or 'nutrition' not in recipe_details or not recipe_details['nutrition']['nutrients']:
-            logging.warning("Nutritional information not available or incomplete.")
-            return None
+        with metrics.span("core.analyze_nutrition"):
+            recipe = as_recipe(recipe_details)
+            if not recipe or not recipe.nutrient_names:
+                logging.warning("Nutritional information not available or incomplete.")
+                return None
+
+            import numpy as np
+            import pandas as pd  # Deferred: pandas dominates import time
 
-        nutrition_data = recipe_details['nutrition']['nutrients']
-        df_nutrition = pd.DataFrame(nutrition_data)
-        return df_nutrition
+            df_nutrition = pd.DataFrame({
+                "name": recipe.nutrient_names,
+                "amount": np.array(recipe.nutrient_amounts, dtype=float),
+                "unit": recipe.nutrient_units,
+                "percentOfDailyNeeds": np.array(recipe.nutrient_percents, dtype=float),
+            })
+            return df_nutrition
 
     except KeyError as e:
         logging.error(f"Error extracting nutrition data: {e}")
@@ -94,6 +365,22 @@ def analyze_nutrition(recipe_details):
         return None
 
 
+def analyze_nutrition_batch(recipes):
+    """
+    Analyzes the nutritional information of many recipes at once.
+
+    Args:
+        recipes (iterable): models.Recipe objects or recipe details from the API.
+
+    Returns:
+        nutrition.NutritionMatrix: Recipe x nutrient matrix in base units,
+        supporting totals, serving scaling, % daily value and top-k queries.
+    """
+    from nutrition import build_nutrition_matrix
+
+    return build_nutrition_matrix(recipes)
+
+
 if __name__ == '__main__':
     # Example usage and testing
     recipes = search_recipes(ingredients="chicken,rice", cuisine="Indian", diet="vegetarian")
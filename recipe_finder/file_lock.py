@@ -0,0 +1,39 @@
+# file_lock.py
+
+import contextlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextlib.contextmanager
+def locked(path):
+    """
+    Holds an exclusive lock on a lock file for the duration of a with block.
+
+    The lock is advisory and shared by every process using the same path, so
+    app instances and the service can take turns updating files in cache/.
+
+    Args:
+        path (str): Lock file; created if missing, never removed.
+
+    Raises:
+        OSError: If the lock file can't be opened or locked.
+    """
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
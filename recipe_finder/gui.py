@@ -1,12 +1,22 @@
 # gui.py
 
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+from tkinter import ttk, scrolledtext, messagebox, filedialog
+from collections import OrderedDict
+from config import (IMAGE_CACHE_DIR, IMAGE_SIZE, IMAGE_MEMORY_CACHE_SIZE,
+                    SEARCH_LOAD_MORE_THRESHOLD)
+from images import ImageLoader
+import metrics
 
 class RecipeGUI(tk.Frame):
-    def __init__(self, master=None):
+    def __init__(self, master=None, scheduler=None):
         super().__init__(master)
         self.master = master
+        self.image_loader = ImageLoader(scheduler, IMAGE_CACHE_DIR, size=IMAGE_SIZE)
+        self._photo_cache = OrderedDict()  # image URL -> PhotoImage, least recently used first
+        self._current_image_url = None
+        self._result_ids = set()
+        self.on_results_near_end = None  # Set by main.py to load the next page of results
         self.pack(fill=tk.BOTH, expand=True)
         self.create_widgets()
 
@@ -45,6 +55,11 @@ class RecipeGUI(tk.Frame):
         self.search_button = ttk.Button(self.input_frame, text="Find Recipes", command=self.search_recipes, style="Accent.TButton")
         self.search_button.grid(row=0, column=6, padx=10, pady=5)
 
+        self.live_search_var = tk.BooleanVar(value=False)
+        self.live_search_check = ttk.Checkbutton(self.input_frame, text="Live search",
+                                                 variable=self.live_search_var)
+        self.live_search_check.grid(row=0, column=7, padx=5, pady=5)
+
         # --- Results Frame ---
         self.results_frame = ttk.Frame(self, padding=15)
         self.results_frame.pack(fill=tk.BOTH, expand=True)
@@ -54,7 +69,7 @@ class RecipeGUI(tk.Frame):
         self.results_listbox.bind('<<ListboxSelect>>', self.show_recipe_details)
 
         self.results_scrollbar = ttk.Scrollbar(self.results_frame, orient=tk.VERTICAL, command=self.results_listbox.yview)
-        self.results_listbox['yscrollcommand'] = self.results_scrollbar.set
+        self.results_listbox['yscrollcommand'] = self._on_results_scrolled
         self.results_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         # --- Details Frame - Modified to have two sections side by side ---
@@ -76,8 +91,19 @@ class RecipeGUI(tk.Frame):
         # Right side will be used for the nutrition chart in viz.py
 
         # --- Status Bar ---
-        self.status_label = ttk.Label(self, text="Ready", anchor=tk.W)
-        self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+        self.status_frame = ttk.Frame(self)
+        self.status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.status_label = ttk.Label(self.status_frame, text="Ready", anchor=tk.W)
+        self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        self.diagnostics_button = ttk.Button(self.status_frame, text="Diagnostics",
+                                             command=self.show_diagnostics)
+        self.diagnostics_button.pack(side=tk.RIGHT)
+
+        self.quota_label = ttk.Label(self.status_frame, text="", anchor=tk.E)
+        self.quota_label.pack(side=tk.RIGHT, padx=10)
+        self.diagnostics_window = None
 
         # --- Accent Button Style ---
         self.style.configure("Accent.TButton",
@@ -96,50 +122,173 @@ class RecipeGUI(tk.Frame):
 
     def update_results(self, recipes):
         self.results_listbox.delete(0, tk.END)
+        self._result_ids = set()
         if recipes and recipes.get('results'):
-            for recipe in recipes['results']:
-                self.results_listbox.insert(tk.END, f"{recipe['title']} ({recipe['id']})")
+            self.append_results(recipes)
         else:
             self.results_listbox.insert(tk.END, "No recipes found.")
 
+    def append_results(self, recipes):
+        """
+        Adds a further page of results below the current ones, skipping
+        recipes already listed.
+
+        Returns:
+            int: Number of rows added.
+        """
+        rows = []
+        for recipe in recipes.get('results') or []:
+            if recipe['id'] not in self._result_ids:
+                self._result_ids.add(recipe['id'])
+                rows.append(f"{recipe['title']} ({recipe['id']})")
+        if rows:
+            self.results_listbox.insert(tk.END, *rows)
+        return len(rows)
+
+    def _on_results_scrolled(self, first, last):
+        self.results_scrollbar.set(first, last)
+        if self.on_results_near_end is not None and float(last) >= SEARCH_LOAD_MORE_THRESHOLD:
+            self.on_results_near_end()
+
+    def show_diagnostics(self, event=None):
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+        else:
+            self.diagnostics_window = DiagnosticsWindow(self.master)
+
+    def update_quota(self, stats):
+        queued = f" | {stats['queued']} queued" if stats['queued'] else ""
+        self.quota_label.config(
+            text=f"API points left: {stats['points_remaining']:.0f}{queued}")
+
     def update_details(self, details):
         self.details_text.config(state=tk.NORMAL)
         self.details_text.delete("1.0", tk.END)
 
         if details:
-            title = details.get('title', 'No Title')
-            ingredients = "\n".join([f"- {ing['original']}" for ing in details.get('extendedIngredients', [])])
-            instructions = details.get('instructions', 'No Instructions')
+            title = details.title or 'No Title'
+            ingredients = "\n".join([f"- {ing.original}" for ing in details.ingredients])
+            instructions = details.instructions or 'No Instructions'
 
             details_string = f"Title: {title}\n\nIngredients:\n{ingredients}\n\nInstructions:\n{instructions}"
             self.details_text.insert(tk.END, details_string)
 
             # --- Display Image ---
-            image_url = details.get('image')
-            if image_url:
-                try:
-                    import urllib.request
-                    import io
-                    from PIL import Image, ImageTk  # Import here to avoid errors if not running GUI
-                    image_data = urllib.request.urlopen(image_url).read()
-                    pil_image = Image.open(io.BytesIO(image_data))
-                    
-                    # Resize image to fit better in the UI
-                    pil_image = pil_image.resize((300, 200), Image.LANCZOS)
-                    
-                    tk_image = ImageTk.PhotoImage(pil_image)
-                    self.image_label.config(image=tk_image)
-                    self.image_label.image = tk_image  # Keep a reference
-                except Exception as e:
-                    print(f"Error loading image: {e}")
-                    self.image_label.config(image=None)
-                    self.image_label.config(text="Image not available")
-            else:
-                self.image_label.config(image=None)
-                self.image_label.config(text="Image not available")
+            self.show_image(details.image)
         else:
             self.details_text.insert(tk.END, "Failed to fetch recipe details.")
-            self.image_label.config(image=None)
-            self.image_label.config(text="Details not available")
+            self._current_image_url = None
+            self.image_label.config(image='', text="Details not available")
+
+        self.details_text.config(state=tk.DISABLED)
+
+    def show_image(self, image_url):
+        """
+        Shows a recipe image, loading it in the background if it is not cached.
+
+        Args:
+            image_url (str): URL of the image, or None.
+        """
+        self._current_image_url = image_url
+        if not image_url:
+            self.image_label.config(image='', text="Image not available")
+            return
+
+        tk_image = self._photo_cache.get(image_url)
+        if tk_image is not None:
+            metrics.incr("images.memory_hits")
+            self._photo_cache.move_to_end(image_url)
+            self._set_image(tk_image)
+            return
+
+        self.image_label.config(image='', text="Loading image...")
+        self.image_label.image = None
+        self.image_loader.load(
+            image_url, lambda pil_image: self._on_image_loaded(image_url, pil_image))
+
+    def _on_image_loaded(self, image_url, pil_image):
+        if pil_image is None:
+            if image_url == self._current_image_url:
+                self.image_label.config(image='', text="Image not available")
+            return
+
+        from PIL import ImageTk  # Import here to avoid errors if not running GUI
+        with metrics.span("gui.photo_image"):
+            tk_image = ImageTk.PhotoImage(pil_image)
+        self._photo_cache[image_url] = tk_image
+        while len(self._photo_cache) > IMAGE_MEMORY_CACHE_SIZE:
+            self._photo_cache.popitem(last=False)
+
+        if image_url == self._current_image_url:
+            self._set_image(tk_image)
+
+    def _set_image(self, tk_image):
+        self.image_label.config(image=tk_image, text="")
+        self.image_label.image = tk_image  # Keep a reference
+
+
+class DiagnosticsWindow(tk.Toplevel):
+    """
+    Live view of the per-stage latency histograms and counters in metrics.py.
+    """
+
+    REFRESH_MS = 1000
+
+    def __init__(self, master=None):
+        super().__init__(master)
+        self.title("Diagnostics")
+        self.geometry("720x420")
+
+        columns = ("count", "p50", "p95", "p99", "max")
+        self.tree = ttk.Treeview(self, columns=columns, show="tree headings")
+        self.tree.heading("#0", text="Stage")
+        self.tree.column("#0", width=260)
+        for column in columns:
+            self.tree.heading(column, text=column if column == "count" else f"{column} (ms)")
+            self.tree.column(column, width=80, anchor=tk.E)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Button(button_frame, text="Dump JSON...", command=self.dump).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="Reset", command=self.reset).pack(side=tk.LEFT, padx=5)
+        self.state_label = ttk.Label(button_frame, text="")
+        self.state_label.pack(side=tk.RIGHT)
+
+        self._refresh_job = None
+        self.refresh()
+
+    def refresh(self):
+        snapshot = metrics.snapshot()
+        self.tree.delete(*self.tree.get_children())
+        for name, summary in snapshot["histograms"].items():
+            if summary["count"]:
+                values = (summary["count"],) + tuple(
+                    f"{summary[key]:.2f}" for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms"))
+            else:
+                values = (0, "", "", "", "")
+            self.tree.insert("", tk.END, text=name, values=values)
+        for name, count in snapshot["counters"].items():
+            self.tree.insert("", tk.END, text=name, values=(count, "", "", "", ""))
+        self.state_label.config(text="" if snapshot["enabled"] else "Instrumentation is disabled")
+        self._refresh_job = self.after(self.REFRESH_MS, self.refresh)
+
+    def dump(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            metrics.dump_json(path)
+
+    def reset(self):
+        metrics.reset()
+        # Redraw now and restart the existing refresh loop rather than adding another
+        if self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+        self.refresh()
 
-        self.details_text.config(state=tk.DISABLED)
\ No newline at end of file
+    def destroy(self):
+        # Tkinter deletes the refresh command on destroy, so the pending job must not fire
+        if self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        super().destroy()
\ No newline at end of file
@@ -0,0 +1,155 @@
+# http_client.py
+
+import email.utils
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+import metrics
+from ratelimit import RateLimiter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+_rate_limiter = RateLimiter(config.RATE_LIMIT_PER_SECOND, config.RATE_LIMIT_BURST,
+                            config.DAILY_POINTS)
+
+
+def get_rate_limiter():
+    """
+    Returns the rate limiter shared by every API call.
+
+    Returns:
+        RateLimiter: The shared rate limiter.
+    """
+    return _rate_limiter
+
+
+def get_session():
+    """
+    Returns the shared requests.Session, creating it on first use.
+
+    The session keeps a pool of keep-alive connections so repeated calls to
+    the API skip the DNS, TCP and TLS setup.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=config.HTTP_POOL_SIZE,
+                                      pool_maxsize=config.HTTP_POOL_SIZE,
+                                      max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get_json(path, params=None):
+    """
+    Performs a GET request against the API and decodes the JSON response.
+
+    The API key is added to the query parameters, which are URL-encoded by
+    requests. Every attempt waits for the shared rate limiter, at the
+    priority of the calling thread. Connection errors, timeouts and 429/5xx
+    responses are retried with jittered exponential backoff, honoring
+    Retry-After when present.
+
+    When SERVICE_URL is set the request goes to that recipe_finder service
+    instead, once, without the API key or local throttling: the service
+    applies the rate limit and retries upstream itself, so retrying it would
+    only multiply upstream calls.
+
+    Args:
+        path (str): API path, e.g. "/recipes/complexSearch".
+        params (dict, optional): Query parameters.
+
+    Returns:
+        dict: Decoded JSON response.
+
+    Raises:
+        requests.exceptions.RequestException: If the request ultimately fails,
+            including ratelimit.QuotaExhaustedError when the daily budget is used up.
+        json.JSONDecodeError: If the response body is not valid JSON.
+    """
+    service_url = config.SERVICE_URL
+    max_retries = 0 if service_url else config.HTTP_MAX_RETRIES
+    url = f"{service_url or config.BASE_URL}{path}"
+    query = dict(params or {})
+    if not service_url:
+        query["apiKey"] = config.API_KEY
+    timeout = (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+
+    attempt = 0
+    while True:
+        if not service_url:
+            with metrics.span("http.rate_limit_wait"):
+                _rate_limiter.acquire()
+        logging.info(f"API request: {path} {params or {}}")
+        metrics.incr("http.requests")
+        try:
+            with metrics.span("http.request"):
+                response = get_session().get(url, params=query, timeout=timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            metrics.incr("http.connection_errors")
+            if attempt >= max_retries:
+                raise
+            delay = _backoff_delay(attempt)
+            logging.warning(f"API request failed ({e}), retrying in {delay:.2f}s")
+        else:
+            _rate_limiter.record_response(response.headers)
+            if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                response.raise_for_status()
+                with metrics.span("http.json_decode"):
+                    return response.json()
+            delay = _retry_after(response)
+            if delay is None:
+                delay = _backoff_delay(attempt)
+            elif delay > config.HTTP_BACKOFF_MAX:
+                response.raise_for_status()
+            logging.warning(f"API returned {response.status_code}, retrying in {delay:.2f}s")
+        metrics.incr("http.retries")
+        time.sleep(delay)
+        attempt += 1
+
+
+def _backoff_delay(attempt):
+    """
+    Returns a full-jitter exponential backoff delay for the given attempt.
+    """
+    ceiling = min(config.HTTP_BACKOFF_MAX, config.HTTP_BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def _retry_after(response):
+    """
+    Parses the Retry-After header of a response.
+
+    Args:
+        response (requests.Response): The response to inspect.
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
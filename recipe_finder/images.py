@@ -0,0 +1,114 @@
+# images.py
+
+import hashlib
+import io
+import logging
+import os
+
+import metrics
+from config import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+
+
+class ImageLoader:
+    """
+    Downloads, decodes and resizes recipe images on the scheduler's workers.
+
+    Resized thumbnails are kept in an on-disk cache keyed by URL, so an image
+    is downloaded and decoded at full size at most once.
+    """
+
+    def __init__(self, scheduler, cache_dir, size=(300, 200)):
+        """
+        Args:
+            scheduler (TaskScheduler): Scheduler running the loads.
+            cache_dir (str): Directory for cached thumbnails.
+            size (tuple): Thumbnail (width, height) in pixels.
+        """
+        self.scheduler = scheduler
+        self.cache_dir = cache_dir
+        self.size = size
+        self._in_flight = {}  # Only touched on the Tk thread
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def load(self, url, callback):
+        """
+        Loads a thumbnail in the background. Must be called on the Tk thread.
+
+        Args:
+            url (str): Image URL.
+            callback (callable): Called on the Tk thread with the resized
+                PIL image, or None on error.
+        """
+        callbacks = self._in_flight.get(url)
+        if callbacks is not None:
+            callbacks.append(callback)
+            return
+        self._in_flight[url] = [callback]
+        self.scheduler.submit(self.load_sync, url,
+                              on_done=lambda image: self._deliver(url, image),
+                              on_error=lambda e: self._deliver(url, None))
+
+    def _deliver(self, url, image):
+        for callback in self._in_flight.pop(url, []):
+            try:
+                callback(image)
+            except Exception as e:
+                logging.error(f"Error in image callback for {url}: {e}")
+
+    def load_sync(self, url):
+        """
+        Loads a thumbnail on the calling thread, from disk if cached.
+
+        Args:
+            url (str): Image URL.
+
+        Returns:
+            PIL.Image.Image: The resized image.
+        """
+        with metrics.span("images.disk_read"):
+            image = self._read_cached(url)
+        if image is None:
+            metrics.incr("images.disk_misses")
+            image = self._download(url)
+        return image
+
+    def _cache_path(self, url):
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.png")
+
+    def _read_cached(self, url):
+        from PIL import Image
+
+        path = self._cache_path(url)
+        if not os.path.exists(path):
+            return None
+        try:
+            with Image.open(path) as cached:
+                cached.load()
+                return cached.copy()
+        except OSError as e:
+            logging.warning(f"Discarding unreadable cached image {path}: {e}")
+            os.remove(path)
+            return None
+
+    def _download(self, url):
+        import http_client
+        from PIL import Image
+
+        with metrics.span("images.download"):
+            response = http_client.get_session().get(
+                url, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+            response.raise_for_status()
+        with metrics.span("images.decode_resize"):
+            image = Image.open(io.BytesIO(response.content))
+            image.draft("RGB", self.size)  # Let JPEG decode at a reduced scale
+            image = image.convert("RGB").resize(self.size, Image.LANCZOS)
+
+        path = self._cache_path(url)
+        tmp_path = f"{path}.tmp"
+        try:
+            image.save(tmp_path, format="PNG")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not cache image {url}: {e}")
+        return image
@@ -0,0 +1,238 @@
+# index.py
+
+import atexit
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+
+from file_lock import locked
+from models import as_recipe
+
+_NON_WORD = re.compile(r"[^a-z\s]+")
+
+
+def normalize_ingredient(name):
+    """
+    Normalizes an ingredient name for matching.
+
+    Lowercases, drops punctuation and digits, collapses whitespace and
+    singularizes each word naively, so "Tomatoes," and "tomato" match.
+
+    Args:
+        name (str): Ingredient name as written in a query or recipe.
+
+    Returns:
+        str: The normalized name, possibly empty.
+    """
+    words = _NON_WORD.sub(" ", str(name).lower()).split()
+    return " ".join(_singular(word) for word in words)
+
+
+def _singular(word):
+    if len(word) > 4 and word.endswith("oes"):
+        return word[:-2]
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+class RecipeIndex:
+    """
+    Local inverted index over fetched recipe details.
+
+    Maps normalized ingredient and title words to recipe ids, with cuisine
+    and diet facets, so ingredient searches can be answered without the API.
+    The index is updated incrementally and pickled to disk at most every
+    ``save_interval`` seconds and at exit. Saves hold a lock file next to the
+    pickle and first merge in recipes other processes sharing it have saved.
+    """
+
+    def __init__(self, path, save_interval=5.0):
+        """
+        Args:
+            path (str): Location of the pickled index.
+            save_interval (float): Minimum seconds between saves.
+        """
+        self.path = path
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._recipes = {}
+        self._postings = {}
+        self._cuisines = {}
+        self._diets = {}
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._saved_mtime = None  # mtime of the pickle when last read or written
+        self._load()
+        atexit.register(self.save)
+
+    def __len__(self):
+        return len(self._recipes)
+
+    def __contains__(self, recipe_id):
+        return recipe_id in self._recipes
+
+    def words(self, recipe_id):
+        """
+        Returns:
+            frozenset: Normalized ingredient and title words of an indexed
+            recipe, or None if it isn't indexed.
+        """
+        entry = self._recipes.get(recipe_id)
+        return entry["words"] if entry is not None else None
+
+    def ingredients(self, recipe_id):
+        """
+        Returns:
+            frozenset: Normalized ingredient names of an indexed recipe, or
+            None if it isn't indexed.
+        """
+        entry = self._recipes.get(recipe_id)
+        return entry.get("ingredients") if entry is not None else None
+
+    def add(self, details):
+        """
+        Adds or replaces a recipe.
+
+        Args:
+            details (models.Recipe or dict): The recipe or its API details.
+        """
+        recipe = as_recipe(details)
+        recipe_id = recipe.id if recipe else None
+        if recipe_id is None:
+            return
+
+        ingredients = {normalize_ingredient(ingredient.name) for ingredient in recipe.ingredients}
+        ingredients.discard("")
+        words = set()
+        for ingredient in ingredients:
+            words.update(ingredient.split())
+        words.update(normalize_ingredient(recipe.title).split())
+        cuisines = {cuisine.lower() for cuisine in recipe.cuisines}
+        diets = recipe.diets
+
+        with self._lock:
+            if recipe_id in self._recipes:
+                self._remove(recipe_id)
+            self._insert(recipe_id, {
+                "title": recipe.title,
+                "image": recipe.image,
+                "words": frozenset(words),
+                "ingredients": frozenset(ingredients),
+                "cuisines": frozenset(cuisines),
+                "diets": frozenset(diets),
+            })
+            self._dirty = True
+            due = time.monotonic() - self._last_save >= self.save_interval
+
+        if due:
+            self.save()
+
+    def search(self, ingredients, cuisine=None, diet=None, limit=10):
+        """
+        Finds indexed recipes matching the query, best ingredient overlap first.
+
+        Args:
+            ingredients (str): Comma-separated ingredients.
+            cuisine (str, optional): Cuisine type.
+            diet (str, optional): Dietary restriction.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list: Result dicts with id, title, image and matchedIngredients.
+        """
+        terms = [normalize_ingredient(term).split() for term in str(ingredients).split(",")]
+        terms = [term for term in terms if term]
+        if not terms:
+            return []
+
+        with self._lock:
+            scores = {}
+            for term in terms:
+                matches = set.intersection(*(self._postings.get(word, set()) for word in term))
+                for recipe_id in matches:
+                    scores[recipe_id] = scores.get(recipe_id, 0) + 1
+            if cuisine:
+                allowed = self._cuisines.get(cuisine.lower(), set())
+                scores = {recipe_id: score for recipe_id, score in scores.items() if recipe_id in allowed}
+            if diet:
+                allowed = self._diets.get(diet.lower(), set())
+                scores = {recipe_id: score for recipe_id, score in scores.items() if recipe_id in allowed}
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+            return [{"id": recipe_id,
+                     "title": self._recipes[recipe_id]["title"],
+                     "image": self._recipes[recipe_id]["image"],
+                     "matchedIngredients": score}
+                    for recipe_id, score in ranked]
+
+    def save(self):
+        """
+        Writes the index to disk if it changed since the last save, keeping
+        the recipes other processes saved in the meantime.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with locked(f"{self.path}.lock"):
+                    self._merge_saved()
+                    state = (self._recipes, self._postings, self._cuisines, self._diets)
+                    tmp_path = f"{self.path}.tmp"
+                    with open(tmp_path, "wb") as f:
+                        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(tmp_path, self.path)
+                    self._saved_mtime = os.stat(self.path).st_mtime_ns
+                self._dirty = False
+            except (OSError, pickle.PickleError, EOFError, ValueError) as e:
+                logging.error(f"Error saving recipe index: {e}")
+            self._last_save = time.monotonic()
+
+    def _merge_saved(self):
+        # Recipes indexed here win over the saved copies; the rest are added
+        if not os.path.exists(self.path) or os.stat(self.path).st_mtime_ns == self._saved_mtime:
+            return
+        with open(self.path, "rb") as f:
+            recipes = pickle.load(f)[0]
+        for recipe_id, entry in recipes.items():
+            if recipe_id not in self._recipes:
+                self._insert(recipe_id, entry)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            self._saved_mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path, "rb") as f:
+                self._recipes, self._postings, self._cuisines, self._diets = pickle.load(f)
+            logging.info(f"Loaded recipe index with {len(self._recipes)} recipes")
+        except (OSError, pickle.PickleError, EOFError, ValueError) as e:
+            logging.error(f"Error loading recipe index, starting empty: {e}")
+
+    def _insert(self, recipe_id, entry):
+        self._recipes[recipe_id] = entry
+        for mapping, keys in ((self._postings, entry["words"]),
+                              (self._cuisines, entry["cuisines"]),
+                              (self._diets, entry["diets"])):
+            for key in keys:
+                mapping.setdefault(key, set()).add(recipe_id)
+
+    def _remove(self, recipe_id):
+        entry = self._recipes.pop(recipe_id)
+        for mapping, keys in ((self._postings, entry["words"]),
+                              (self._cuisines, entry["cuisines"]),
+                              (self._diets, entry["diets"])):
+            for key in keys:
+                ids = mapping.get(key)
+                if ids is not None:
+                    ids.discard(recipe_id)
+                    if not ids:
+                        del mapping[key]
@@ -0,0 +1,124 @@
+# livesearch.py
+
+import threading
+from collections import OrderedDict
+
+from index import normalize_ingredient
+
+
+def query_terms(ingredients):
+    """
+    Splits a comma-separated ingredient query into normalized terms.
+
+    Order, case, plurals and stray commas don't matter, so "Rice, chicken,"
+    and "chicken,rice" give the same terms.
+
+    Args:
+        ingredients (str): Ingredients as typed.
+
+    Returns:
+        frozenset: Normalized, non-empty terms.
+    """
+    terms = (normalize_ingredient(term) for term in str(ingredients).split(","))
+    return frozenset(term for term in terms if term)
+
+
+def _term_narrows(broad, specific):
+    # "chick" -> "chicken" and "rice" -> "rice noodle" only ever lose matches
+    broad_words, specific_words = broad.split(), specific.split()
+    return len(broad_words) <= len(specific_words) and all(
+        word.startswith(prefix) for prefix, word in zip(broad_words, specific_words))
+
+
+def _recipe_matches(terms, words):
+    return all(any(word.startswith(term_word) for word in words)
+               for term in terms for term_word in term.split())
+
+
+class PrefixCache:
+    """
+    Recent live-search responses, reusable for narrower queries.
+
+    A query is narrower than a cached one when it has the same filters and
+    each cached term is still present, possibly typed further ("chicken" ->
+    "chicken,rice", or "chick" -> "chicken"). Its results are then a subset
+    of the cached results, so they can be filtered locally and shown while
+    the API call for the new query is still in flight.
+    """
+
+    def __init__(self, max_entries=64):
+        """
+        Args:
+            max_entries (int): Responses kept, least recently used dropped first.
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (terms, cuisine, diet) -> response
+
+    @staticmethod
+    def _key(ingredients, cuisine, diet):
+        return query_terms(ingredients), (cuisine or "").lower(), (diet or "").lower()
+
+    def get(self, ingredients, cuisine=None, diet=None):
+        """
+        Returns:
+            dict: The cached response for an equivalent query, or None.
+        """
+        key = self._key(ingredients, cuisine, diet)
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response
+
+    def put(self, ingredients, cuisine, diet, response):
+        """Stores the API response for a query."""
+        if not response:
+            return
+        key = self._key(ingredients, cuisine, diet)
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def narrow(self, ingredients, cuisine=None, diet=None, words_for=None):
+        """
+        Filters the closest broader cached response down to a narrower query.
+
+        Args:
+            ingredients (str): The new query.
+            cuisine (str, optional): Cuisine type.
+            diet (str, optional): Dietary restriction.
+            words_for (callable, optional): Maps a recipe id to its normalized
+                ingredient and title words, or None when unknown. Recipes it
+                doesn't know are matched on their title alone.
+
+        Returns:
+            dict: A provisional response shaped like the API search response,
+            or None if no cached query is broader than this one.
+        """
+        terms, cuisine_key, diet_key = self._key(ingredients, cuisine, diet)
+        if not terms:
+            return None
+
+        best = None
+        with self._lock:
+            for (cached_terms, cached_cuisine, cached_diet), response in reversed(self._entries.items()):
+                if (cached_cuisine, cached_diet) != (cuisine_key, diet_key) or not cached_terms:
+                    continue
+                if all(any(_term_narrows(broad, term) for term in terms) for broad in cached_terms):
+                    if best is None or len(cached_terms) > len(best[0]):
+                        best = (cached_terms, response)
+        if best is None:
+            return None
+
+        results = []
+        for recipe in best[1].get('results') or []:
+            words = words_for(recipe['id']) if words_for else None
+            if words is None:
+                words = normalize_ingredient(recipe.get('title', "")).split()
+            if _recipe_matches(terms, words):
+                results.append(recipe)
+        return {"results": results, "offset": 0, "number": len(results),
+                "totalResults": len(results), "source": "prefix"}
@@ -1,13 +1,29 @@
 #   main.py
 
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse
+import functools
+import sys
 import tkinter as tk
-import threading
-import core
 import gui
-import viz
+from config import (PREFETCH_COUNT, SCHEDULER_WORKERS,
+                    SCHEDULER_BACKGROUND_WORKERS, SCHEDULER_POLL_MS,
+                    QUOTA_REFRESH_MS, LIVE_SEARCH_DEBOUNCE_MS,
+                    LIVE_SEARCH_MIN_CHARS, LIVE_SEARCH_CACHE_SIZE,
+                    SEARCH_PAGE_SIZE, SEARCH_MAX_RESULTS, PANTRY_RERANK)
+from livesearch import PrefixCache
+from prefetch import Prefetcher
+from scheduler import TaskScheduler, LANE_BACKGROUND
+from startup import StartupProfiler, warm_up
 from tkinter import messagebox
 import logging
 
+#   core (requests, pandas) and viz (matplotlib) are imported lazily: they are
+#   warmed up on a background thread once the window is shown.
+
 #   Configure logging
 logging.basicConfig(level=logging.INFO, filename="logs/app.log",
                     format="%(asctime)s - %(levelname)s - %(message)s")
@@ -15,12 +31,60 @@ logging.basicConfig(level=logging.INFO, filename="logs/app.log",
 
 class RecipeApp:
 
-    def __init__(self, root):
+    def __init__(self, root, profiler=None):
         self.root = root
-        self.recipe_gui = gui.RecipeGUI(master=self.root)
+        self.profiler = profiler
+        self.scheduler = TaskScheduler(self.root, workers=SCHEDULER_WORKERS,
+                                       background_limit=SCHEDULER_BACKGROUND_WORKERS,
+                                       poll_interval=SCHEDULER_POLL_MS)
+        self.recipe_gui = gui.RecipeGUI(master=self.root, scheduler=self.scheduler)
         self.recipe_gui.search_button.config(command=self.search_recipes)
         self.recipe_gui.results_listbox.bind("<<ListboxSelect>>", self.show_recipe_details)
-        self.nutrition_canvas = None  # Placeholder for the chart
+        self.root.bind("<F12>", self.recipe_gui.show_diagnostics)
+        self.nutrition_chart = None  # Created on the first recipe selection
+        self._core = None  # Set once the warm-up has finished importing core
+        self.prefetcher = Prefetcher(self.scheduler, self._fetch_details, self._fetch_details_bulk)
+        self.prefix_cache = PrefixCache(LIVE_SEARCH_CACHE_SIZE)
+        self._live_query = None
+        self._live_search_job = None
+        self._page_query = None
+        self._next_offset = None  # Offset of the next page to load, None when done
+        self._page_loading = False
+        self.recipe_gui.on_results_near_end = self._load_next_page
+        self.recipe_gui.ingredients_entry.bind("<KeyRelease>", self._on_query_changed)
+        self.recipe_gui.cuisine_combobox.bind("<<ComboboxSelected>>", self._on_query_changed)
+        self.recipe_gui.diet_combobox.bind("<<ComboboxSelected>>", self._on_query_changed)
+        self._refresh_quota()
+        self.root.after_idle(self._start_warm_up)
+
+    def _start_warm_up(self):
+        if self.profiler:
+            self.profiler.mark("window shown (first idle)")
+        self.scheduler.submit(warm_up, self.profiler, on_done=self._warm_up_done,
+                              lane=LANE_BACKGROUND)
+
+    def _warm_up_done(self, _):
+        # Only read sys.modules now: during the warm-up core may be half imported
+        self._core = sys.modules.get("core")
+        if self.profiler:
+            self.profiler.mark("background warm-up done")
+            report = self.profiler.report()
+            logging.info(report)
+            print(report, file=sys.stderr)
+
+    def _fetch_details(self, recipe_id):
+        import core
+        return core.get_recipe_details_with_nutrition(recipe_id)
+
+    def _fetch_details_bulk(self, recipe_ids):
+        import core
+        return core.get_recipe_details_bulk(recipe_ids)
+
+    def _perform_search(self, ingredients, cuisine, diet, offset=0):
+        import core
+        recipes = core.search_recipes(ingredients, cuisine, diet, offset=offset,
+                                      number=SEARCH_PAGE_SIZE)
+        return core.rank_by_pantry(ingredients, recipes) if PANTRY_RERANK else recipes
 
     def search_recipes(self):
         ingredients = self.recipe_gui.ingredients_entry.get()
@@ -32,26 +96,121 @@ class RecipeApp:
                                     "Please enter ingredients to search for.")
             return
 
+        self._live_query = (ingredients, cuisine, diet)
+        self._start_search(ingredients, cuisine, diet)
+
+    def _start_search(self, ingredients, cuisine, diet):
+        if self._live_search_job is not None:
+            self.root.after_cancel(self._live_search_job)
+            self._live_search_job = None
+
+        # A new search supersedes any pending search, detail load and prefetch
+        self.prefetcher.cancel()
+        self.scheduler.cancel("details")
+        self.scheduler.cancel("search")
+        self._reset_paging()
         self.recipe_gui.status_label.config(text="Searching...")
-        self.root.update_idletasks()
-        threading.Thread(target=self._perform_search,
-                        args=(ingredients, cuisine, diet)).start()
+        self.scheduler.submit(self._perform_search, ingredients, cuisine, diet,
+                              on_done=functools.partial(self._search_done, ingredients, cuisine, diet),
+                              on_error=self._search_error_callback,
+                              channel="search")
 
-    def _perform_search(self, ingredients, cuisine, diet):
-        try:
-            recipes = core.search_recipes(ingredients=ingredients,
-                                        cuisine=cuisine,
-                                        diet=diet)
-            self.root.after(0, self._update_results_callback, recipes)
-        except Exception as e:
-            logging.error(f"Error during recipe search: {e}")
-            self.root.after(0, self._show_error,
-                            "Error searching recipes. Please check logs.")
+    def _on_query_changed(self, event=None):
+        """
+        Live search: shows cached or locally narrowed results right away and
+        sends the API request once typing pauses.
+        """
+        if not self.recipe_gui.live_search_var.get():
+            return
+        query = (self.recipe_gui.ingredients_entry.get(), self.recipe_gui.cuisine_var.get(),
+                 self.recipe_gui.diet_var.get())
+        if query == self._live_query:
+            return  # Cursor movement and other keys that don't edit the query
+        self._live_query = query
+
+        # Whatever was pending or in flight is for an older query
+        if self._live_search_job is not None:
+            self.root.after_cancel(self._live_search_job)
+            self._live_search_job = None
+        self.scheduler.cancel("search")
+        self._reset_paging()
+        if len(query[0].strip()) < LIVE_SEARCH_MIN_CHARS:
+            return
+
+        cached = self.prefix_cache.get(*query)
+        if cached is not None:
+            self._show_results(query, cached)
+            return
+
+        narrowed = self.prefix_cache.narrow(*query, words_for=self._recipe_words)
+        if narrowed is not None:
+            self.recipe_gui.update_results(narrowed)
+            self.recipe_gui.status_label.config(
+                text=f"Refining {len(narrowed['results'])} earlier matches...")
+        self._live_search_job = self.root.after(LIVE_SEARCH_DEBOUNCE_MS, self._start_search, *query)
+
+    def _recipe_words(self, recipe_id):
+        # Titles are used until the warm-up has loaded core
+        return self._core.recipe_words(recipe_id) if self._core is not None else None
+
+    def _search_done(self, ingredients, cuisine, diet, recipes):
+        if recipes is not None:
+            self.prefix_cache.put(ingredients, cuisine, diet, recipes)
+        self._show_results((ingredients, cuisine, diet), recipes)
+
+    def _show_results(self, query, recipes):
+        self._page_query = query
+        self._page_loading = False
+        self._next_offset = self._following_offset(0, recipes)
+        self._update_results_callback(recipes)
+
+    def _reset_paging(self):
+        self._next_offset = None
+        self._page_loading = False
+
+    @staticmethod
+    def _following_offset(offset, recipes):
+        offset += SEARCH_PAGE_SIZE
+        total = min((recipes or {}).get('totalResults', 0), SEARCH_MAX_RESULTS)
+        return offset if offset < total else None
+
+    def _load_next_page(self):
+        """Fetches the next page of results in the background as the list nears its end."""
+        if self._next_offset is None or self._page_loading:
+            return
+        self._page_loading = True
+        ingredients, cuisine, diet = self._page_query
+        self.recipe_gui.status_label.config(text="Loading more recipes...")
+        self.scheduler.submit(self._perform_search, ingredients, cuisine, diet, self._next_offset,
+                              on_done=self._page_loaded, on_error=self._page_error,
+                              channel="search", lane=LANE_BACKGROUND)
+
+    def _page_loaded(self, recipes):
+        self._page_loading = False
+        if not recipes or not recipes.get('results'):
+            self._next_offset = None
+        else:
+            self.recipe_gui.append_results(recipes)
+            self._next_offset = self._following_offset(self._next_offset, recipes)
+        self.recipe_gui.status_label.config(
+            text=f"{self.recipe_gui.results_listbox.size()} recipes loaded.")
+
+    def _page_error(self, error):
+        logging.error(f"Error loading more recipes: {error}")
+        self._reset_paging()
+        self.recipe_gui.status_label.config(text="Could not load more recipes.")
+
+    def _search_error_callback(self, error):
+        logging.error(f"Error during recipe search: {error}")
+        self._show_error("Error searching recipes. Please check logs.")
 
     def _update_results_callback(self, recipes):
         try:
             self.recipe_gui.update_results(recipes)
             self.recipe_gui.status_label.config(text="Search complete.")
+            if recipes and recipes.get('results'):
+                self.prefetcher.prefetch(
+                    [recipe['id'] for recipe in recipes['results'][:PREFETCH_COUNT]])
         except Exception as e:
             logging.error(f"Error updating results: {e}")
             self.root.after(0, self._show_error,
@@ -66,9 +225,9 @@ class RecipeApp:
                 recipe_id = int(recipe_title_with_id.split("(")[-1][:-1])
                 self.recipe_gui.status_label.config(
                     text="Loading recipe details...")
-                self.root.update_idletasks()
-                threading.Thread(target=self._perform_show_details,
-                                args=(recipe_id,)).start()
+                self.scheduler.cancel("details")
+                self.prefetcher.request(recipe_id, self._update_details_callback,
+                                        channel="details")
             except ValueError as ve:
                 logging.error(f"Value error processing recipe ID: {ve}")
                 self.root.after(
@@ -80,17 +239,6 @@ class RecipeApp:
                     0, self._show_error,
                     "Unexpected error. Please check logs.")
 
-    def _perform_show_details(self, recipe_id):
-        try:
-            recipe_details = core.get_recipe_details_with_nutrition(
-                recipe_id)  # Fetch with nutrition
-            self.root.after(0, self._update_details_callback,
-                            recipe_details)
-        except Exception as e:
-            logging.error(f"Error fetching recipe details: {e}")
-            self.root.after(0, self._show_error,
-                            "Error fetching details. Please check logs.")
-
     def _update_details_callback(self, recipe_details):
         try:
             self._update_details(recipe_details)
@@ -101,6 +249,8 @@ class RecipeApp:
                 "Error displaying details or chart. Please check logs.")
 
     def _update_details(self, recipe_details):
+        import core  # Already loaded by the warm-up unless clicked very early
+        import viz
         try:
             # Update recipe text details
             self.recipe_gui.update_details(recipe_details)
@@ -110,16 +260,12 @@ class RecipeApp:
             
             logging.info(f"Nutrition data shape: {nutrition_df.shape if nutrition_df is not None else 'None'}")
             
-            # Clear previous chart if it exists
-            if self.nutrition_canvas:
-                try:
-                    self.nutrition_canvas.get_tk_widget().destroy()
-                except Exception as e:
-                    logging.error(f"Error destroying previous chart: {e}")
-            
-            # Create and embed nutrition chart
-            self.nutrition_canvas = viz.create_nutrition_chart(
-                self.recipe_gui.details_frame, nutrition_df)
+            # Create the chart once, then redraw it in place for later recipes
+            if self.nutrition_chart is None:
+                self.nutrition_chart = viz.create_nutrition_chart(
+                    self.recipe_gui.details_frame, nutrition_df)
+            else:
+                self.nutrition_chart.update(nutrition_df)
             
             self.recipe_gui.status_label.config(text="Ready")
             
@@ -129,16 +275,44 @@ class RecipeApp:
                 0, self._show_error,
                 "Error displaying details or chart. Please check logs.")
 
+    def _refresh_quota(self):
+        try:
+            if self._core is not None:  # Not loaded yet during warm-up
+                self.recipe_gui.update_quota(self._core.get_quota_stats())
+        except Exception as e:
+            logging.error(f"Error updating quota display: {e}")
+        self.root.after(QUOTA_REFRESH_MS, self._refresh_quota)
+
     def _show_error(self, message):
         messagebox.showerror("Error", message)
         self.recipe_gui.status_label.config(text="Error")
 
-def main():
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "batch":
+        import batch
+        return batch.main(argv[1:])
+    if argv and argv[0] == "serve":
+        import service
+        return service.main(argv[1:])
+
+    parser = argparse.ArgumentParser(description="Recipe Finder with Nutrition Analysis")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print a breakdown of startup and warm-up time to stderr")
+    args = parser.parse_args(argv)
+
+    profiler = StartupProfiler(_STARTED) if args.profile_startup else None
+    if profiler:
+        profiler.mark("main.py imports")
     root = tk.Tk()
     root.title("Recipe Finder with Nutrition Analysis")
     root.geometry("1200x800")  # Increased width for better chart display
-    app = RecipeApp(root)
+    if profiler:
+        profiler.mark("Tk root created")
+    app = RecipeApp(root, profiler=profiler)
+    if profiler:
+        profiler.mark("app initialized")
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,182 @@
+# metrics.py
+
+import atexit
+import bisect
+import json
+import logging
+import threading
+import time
+
+from config import METRICS_ENABLED, METRICS_DUMP_PATH
+
+# Bucket upper bounds from 1 µs to ~100 s, 20 per decade (about 12% apart)
+_BOUNDS = [10 ** (exponent / 20) * 1e-6 for exponent in range(0, 20 * 8 + 1)]
+
+_enabled = METRICS_ENABLED
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+
+
+class Histogram:
+    """
+    Latency histogram with fixed log-spaced buckets.
+
+    Recording is O(log buckets) and memory is constant, so it can run on hot
+    paths indefinitely. Percentiles are accurate to a bucket width.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.min = seconds if self.min is None else min(self.min, seconds)
+
+    def percentile(self, p):
+        """Returns the p-th percentile in seconds, or None if empty."""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank and bucket_count:
+                upper = _BOUNDS[i] if i < len(_BOUNDS) else self.max
+                return min(upper, self.max)
+        return self.max
+
+    def summary(self):
+        """
+        Returns:
+            dict: Count and mean/min/max/p50/p95/p99 in milliseconds.
+        """
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000,
+            "min_ms": self.min * 1000,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name):
+    """
+    Times a block of code into the named latency histogram.
+
+    When instrumentation is disabled this returns a shared no-op context
+    manager, so the cost is a function call and a flag check.
+
+    Args:
+        name (str): Stage name, e.g. "http.request".
+    """
+    if not _enabled:
+        return _NOOP_SPAN
+    return _Span(name)
+
+
+def observe(name, seconds):
+    """Records a duration in the named latency histogram."""
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+
+def incr(name, amount=1):
+    """Increments the named counter."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def enable(enabled=True):
+    """Turns instrumentation on or off at runtime."""
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Clears every histogram and counter."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def snapshot():
+    """
+    Returns:
+        dict: Per-stage latency summaries and counters.
+    """
+    with _lock:
+        return {
+            "enabled": _enabled,
+            "histograms": {name: histogram.summary() for name, histogram in sorted(_histograms.items())},
+            "counters": dict(sorted(_counters.items())),
+        }
+
+
+def dump_json(path):
+    """
+    Writes a snapshot of every histogram and counter to a JSON file.
+
+    Args:
+        path (str): Destination file.
+    """
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(snapshot(), f, indent=2)
+        logging.info(f"Metrics written to {path}")
+    except OSError as e:
+        logging.error(f"Error writing metrics to {path}: {e}")
+
+
+if METRICS_DUMP_PATH:
+    atexit.register(dump_json, METRICS_DUMP_PATH)
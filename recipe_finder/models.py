@@ -0,0 +1,177 @@
+# models.py
+
+import sys
+from array import array
+
+
+def _intern(value):
+    # Nutrient names, units and ingredient names repeat across thousands of recipes
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def recipe_diets(details):
+    """
+    Returns the normalized diet facets of a recipe, including the ones
+    implied by the vegetarian/vegan/glutenFree flags and "non-veg".
+    """
+    diets = {str(diet).lower() for diet in details.get('diets') or []}
+    if details.get('vegetarian'):
+        diets.add("vegetarian")
+    if details.get('vegan'):
+        diets.add("vegan")
+    if details.get('glutenFree'):
+        diets.add("gluten free")
+    if not details.get('vegetarian') and not details.get('vegan') and "vegetarian" not in diets:
+        diets.add("non-veg")
+    return diets
+
+
+class Ingredient:
+    """One line of a recipe's ingredient list."""
+
+    __slots__ = ("name", "original")
+
+    def __init__(self, name, original):
+        """
+        Args:
+            name (str): Ingredient name, e.g. "chicken breast".
+            original (str): The line as written in the recipe.
+        """
+        self.name = name
+        self.original = original
+
+    def __repr__(self):
+        return f"Ingredient({self.name!r}, {self.original!r})"
+
+
+class Nutrient:
+    """Amount of one nutrient per serving."""
+
+    __slots__ = ("name", "amount", "unit", "percent_of_daily_needs")
+
+    def __init__(self, name, amount, unit, percent_of_daily_needs=0.0):
+        self.name = name
+        self.amount = amount
+        self.unit = unit
+        self.percent_of_daily_needs = percent_of_daily_needs
+
+    def __repr__(self):
+        return f"Nutrient({self.name!r}, {self.amount!r}, {self.unit!r})"
+
+
+class Recipe:
+    """
+    The parts of a recipe details payload the app uses.
+
+    Everything else in the payload (summary, analyzedInstructions, wine
+    pairings, per-ingredient measures...) is dropped at parse time. Nutrient
+    amounts and percentages are kept in ``array('d')`` buffers alongside
+    tuples of interned names and units, rather than a dict per nutrient.
+    """
+
+    __slots__ = ("id", "title", "image", "servings", "instructions", "cuisines", "diets",
+                 "ingredients", "nutrient_names", "nutrient_units", "nutrient_amounts",
+                 "nutrient_percents")
+
+    def __init__(self, id, title="", image=None, servings=1, instructions=None, cuisines=(),
+                 diets=frozenset(), ingredients=(), nutrient_names=(), nutrient_units=(),
+                 nutrient_amounts=None, nutrient_percents=None):
+        self.id = id
+        self.title = title
+        self.image = image
+        self.servings = servings
+        self.instructions = instructions
+        self.cuisines = cuisines
+        self.diets = diets
+        self.ingredients = ingredients
+        self.nutrient_names = nutrient_names
+        self.nutrient_units = nutrient_units
+        self.nutrient_amounts = nutrient_amounts if nutrient_amounts is not None else array('d')
+        self.nutrient_percents = nutrient_percents if nutrient_percents is not None else array('d')
+
+    def __repr__(self):
+        return f"Recipe({self.id!r}, {self.title!r})"
+
+    @property
+    def nutrients(self):
+        """
+        Returns:
+            list: Nutrient records, built on demand from the compact arrays.
+        """
+        return [Nutrient(*fields) for fields in zip(self.nutrient_names, self.nutrient_amounts,
+                                                    self.nutrient_units, self.nutrient_percents)]
+
+    @classmethod
+    def from_dict(cls, details):
+        """
+        Parses a recipe details payload, keeping only the fields the app uses.
+
+        Accepts both full API payloads and the trimmed dicts written by
+        to_dict(), so cached entries of either kind parse the same way.
+
+        Args:
+            details (dict): Recipe details from the API.
+
+        Returns:
+            Recipe: The parsed recipe.
+        """
+        ingredients = tuple(
+            Ingredient(_intern(ingredient.get('nameClean') or ingredient.get('name') or ""),
+                       ingredient.get('original') or "")
+            for ingredient in details.get('extendedIngredients') or ())
+
+        nutrients = ((details.get('nutrition') or {}).get('nutrients')) or ()
+        names, units = [], []
+        amounts, percents = array('d'), array('d')
+        for nutrient in nutrients:
+            names.append(_intern(nutrient.get('name')))
+            units.append(_intern(nutrient.get('unit') or ""))
+            amounts.append(float(nutrient.get('amount') or 0.0))
+            percents.append(float(nutrient.get('percentOfDailyNeeds') or 0.0))
+
+        return cls(details.get('id'),
+                   title=details.get('title') or "",
+                   image=details.get('image'),
+                   servings=details.get('servings') or 1,
+                   instructions=details.get('instructions'),
+                   cuisines=tuple(_intern(str(cuisine)) for cuisine in details.get('cuisines') or ()),
+                   diets=frozenset(_intern(diet) for diet in recipe_diets(details)),
+                   ingredients=ingredients,
+                   nutrient_names=tuple(names),
+                   nutrient_units=tuple(units),
+                   nutrient_amounts=amounts,
+                   nutrient_percents=percents)
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The kept fields in the API's payload layout, for caching
+            and for the service's JSON responses.
+        """
+        return {
+            "id": self.id,
+            "title": self.title,
+            "image": self.image,
+            "servings": self.servings,
+            "instructions": self.instructions,
+            "cuisines": list(self.cuisines),
+            "diets": sorted(self.diets),
+            "vegetarian": "vegetarian" in self.diets,
+            "vegan": "vegan" in self.diets,
+            "glutenFree": "gluten free" in self.diets,
+            "extendedIngredients": [{"name": ingredient.name, "original": ingredient.original}
+                                    for ingredient in self.ingredients],
+            "nutrition": {"nutrients": [
+                {"name": name, "amount": amount, "unit": unit, "percentOfDailyNeeds": percent}
+                for name, amount, unit, percent in zip(self.nutrient_names, self.nutrient_amounts,
+                                                       self.nutrient_units, self.nutrient_percents)]},
+        }
+
+
+def as_recipe(details):
+    """
+    Returns a Recipe for either a Recipe or a raw details payload, or None.
+    """
+    if details is None or isinstance(details, Recipe):
+        return details
+    return Recipe.from_dict(details)
@@ -0,0 +1,200 @@
+# nutrition.py
+
+import logging
+import warnings
+
+import numpy as np
+
+from models import as_recipe
+
+# Unit -> (base unit, factor to convert into the base unit)
+UNIT_CONVERSIONS = {
+    "g": ("g", 1.0),
+    "mg": ("g", 1e-3),
+    "µg": ("g", 1e-6),
+    "μg": ("g", 1e-6),
+    "mcg": ("g", 1e-6),
+    "ug": ("g", 1e-6),
+    "kg": ("g", 1e3),
+    "kcal": ("kcal", 1.0),
+    "cal": ("kcal", 1e-3),
+    "kj": ("kcal", 1 / 4.184),
+    "iu": ("IU", 1.0),
+    "%": ("%", 1.0),
+}
+
+
+def normalize_unit(unit):
+    """
+    Returns the base unit and conversion factor for a nutrient unit.
+
+    Unknown units are kept as they are with a factor of 1.
+    """
+    key = str(unit or "").strip()
+    return UNIT_CONVERSIONS.get(key.lower(), UNIT_CONVERSIONS.get(key, (key, 1.0)))
+
+
+class NutritionMatrix:
+    """
+    Recipe x nutrient matrix of per-serving amounts in base units.
+
+    Missing nutrients are NaN in ``values`` and count as zero in totals.
+    ``daily_values`` holds the reference daily amount of each nutrient in
+    base units, derived from the percentOfDailyNeeds the API reports.
+    ``recipe_servings`` is the number of servings each recipe makes.
+    """
+
+    def __init__(self, recipe_ids, titles, nutrients, units, values, daily_values, recipe_servings):
+        self.recipe_ids = recipe_ids
+        self.titles = titles
+        self.nutrients = nutrients
+        self.units = units
+        self.values = values
+        self.daily_values = daily_values
+        self.recipe_servings = recipe_servings
+        self._columns = {name: i for i, name in enumerate(nutrients)}
+
+    def __len__(self):
+        return len(self.recipe_ids)
+
+    def column(self, nutrient):
+        """
+        Returns the per-serving amounts of one nutrient for every recipe.
+
+        Raises:
+            KeyError: If no recipe reported the nutrient.
+        """
+        return self.values[:, self._columns[nutrient]]
+
+    def scaled(self, servings):
+        """
+        Scales the per-serving amounts of every recipe to a number of servings.
+
+        Args:
+            servings (float or array-like): Servings for all recipes, or one
+                value per recipe.
+
+        Returns:
+            NutritionMatrix: A matrix with amounts for the given servings.
+        """
+        servings = np.broadcast_to(np.asarray(servings, dtype=float), (len(self),))
+        return NutritionMatrix(self.recipe_ids, self.titles, self.nutrients, self.units,
+                               self.values * servings[:, None], self.daily_values,
+                               self.recipe_servings)
+
+    def whole_recipes(self):
+        """
+        Returns:
+            NutritionMatrix: Amounts for every serving each recipe makes.
+        """
+        return self.scaled(self.recipe_servings)
+
+    def totals(self, servings=None):
+        """
+        Sums nutrients across recipes, e.g. for a meal plan.
+
+        Args:
+            servings (float or array-like, optional): Servings eaten of each
+                recipe; one serving each by default.
+
+        Returns:
+            dict: Nutrient name -> total amount in base units.
+        """
+        matrix = self.values if servings is None else self.scaled(servings).values
+        totals = np.nansum(matrix, axis=0)
+        return dict(zip(self.nutrients, totals.tolist()))
+
+    def percent_daily_value(self):
+        """
+        Returns:
+            numpy.ndarray: Recipe x nutrient matrix of % daily value, NaN where
+            the nutrient has no reference daily value.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.values / self.daily_values * 100
+
+    def top_k(self, nutrient, k=5):
+        """
+        Returns the recipes with the largest amount of a nutrient.
+
+        Args:
+            nutrient (str): Nutrient name, e.g. "Protein".
+            k (int): Number of recipes.
+
+        Returns:
+            list: (recipe id, title, amount) tuples, largest first.
+        """
+        column = np.nan_to_num(self.column(nutrient), nan=-np.inf)
+        k = min(k, len(column))
+        if k <= 0:
+            return []
+        top = np.argpartition(column, -k)[-k:]
+        top = top[np.argsort(column[top])[::-1]]
+        return [(self.recipe_ids[i], self.titles[i], float(column[i]))
+                for i in top if np.isfinite(column[i])]
+
+    def to_frame(self):
+        """
+        Returns:
+            pandas.DataFrame: The matrix indexed by recipe id.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.values, index=self.recipe_ids,
+                            columns=[f"{name} ({unit})" for name, unit in zip(self.nutrients, self.units)])
+
+
+def build_nutrition_matrix(recipes):
+    """
+    Builds a NutritionMatrix from many recipe detail payloads in one pass.
+
+    Args:
+        recipes (iterable): models.Recipe objects or recipe details from the
+            API. Recipes without nutrition data are skipped.
+
+    Returns:
+        NutritionMatrix: The recipe x nutrient matrix.
+    """
+    recipe_ids, titles, recipe_servings = [], [], []
+    columns, units = {}, []
+    rows, cols, amounts, percents = [], [], [], []
+
+    for recipe in recipes:
+        recipe = as_recipe(recipe)
+        if not recipe or not recipe.nutrient_names:
+            continue
+        row = len(recipe_ids)
+        recipe_ids.append(recipe.id)
+        titles.append(recipe.title)
+        recipe_servings.append(recipe.servings)
+        for name, unit, amount, percent in zip(recipe.nutrient_names, recipe.nutrient_units,
+                                               recipe.nutrient_amounts, recipe.nutrient_percents):
+            base_unit, factor = normalize_unit(unit)
+            col = columns.get(name)
+            if col is None:
+                col = columns[name] = len(units)
+                units.append(base_unit)
+            elif units[col] != base_unit:
+                logging.warning(f"Skipping {name} for recipe {recipe.id}: "
+                                f"unit {unit} is not convertible to {units[col]}")
+                continue
+            rows.append(row)
+            cols.append(col)
+            amounts.append(amount * factor)
+            percents.append(percent)
+
+    values = np.full((len(recipe_ids), len(units)), np.nan)
+    values[rows, cols] = amounts
+
+    # Reference daily value per nutrient: amount / (percent / 100), median over recipes
+    reference = np.full_like(values, np.nan)
+    percents = np.asarray(percents)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reference[rows, cols] = np.where(percents > 0, np.asarray(amounts) * 100 / percents, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        daily_values = np.nanmedian(reference, axis=0) if len(recipe_ids) else np.full(len(units), np.nan)
+
+    return NutritionMatrix(recipe_ids, titles, list(columns), units, values,
+                           daily_values, np.asarray(recipe_servings, dtype=float))
+
@@ -0,0 +1,169 @@
+# pantry.py
+
+import functools
+
+import numpy as np
+
+from index import normalize_ingredient
+from models import Recipe
+
+# The same few thousand ingredient names recur across recipes
+_normalize = functools.lru_cache(maxsize=8192)(normalize_ingredient)
+
+
+def parse_pantry(pantry):
+    """
+    Normalizes a pantry given as a comma-separated string or a list of names.
+
+    Returns:
+        list: Distinct normalized ingredient names, in their original order.
+    """
+    items = str(pantry).split(",") if isinstance(pantry, str) else pantry or []
+    names = (normalize_ingredient(item) for item in items)
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def recipe_ingredients(recipe):
+    """
+    Returns the normalized ingredient names of a recipe, from a
+    models.Recipe, the extendedIngredients of its details or the used/missed
+    ingredients of a search result made with fillIngredients.
+
+    Returns:
+        frozenset: Ingredient names; empty if the recipe lists none.
+    """
+    if isinstance(recipe, Recipe):
+        return frozenset(name for name in (_normalize(ingredient.name) for ingredient in recipe.ingredients)
+                         if name)
+    names = set()
+    for field in ("extendedIngredients", "usedIngredients", "missedIngredients"):
+        for ingredient in recipe.get(field) or []:
+            name = _normalize(ingredient.get('nameClean') or ingredient.get('name') or "")
+            if name:
+                names.add(name)
+    return frozenset(names)
+
+
+class IngredientMatrix:
+    """
+    Sparse recipe x ingredient incidence matrix in CSR form.
+
+    Row i lists the ingredient columns of recipe i in
+    ``indices[indptr[i]:indptr[i + 1]]``. A pantry is encoded as a boolean
+    mask over the ingredient vocabulary, so scoring every recipe is one
+    gather and one bincount regardless of how many recipes there are.
+    """
+
+    def __init__(self, ingredient_sets):
+        """
+        Args:
+            ingredient_sets (list): One iterable of normalized ingredient
+                names per recipe.
+        """
+        self.vocabulary = {}
+        indices = []
+        counts = np.zeros(len(ingredient_sets), dtype=np.int32)
+        for row, names in enumerate(ingredient_sets):
+            for name in names:
+                indices.append(self.vocabulary.setdefault(name, len(self.vocabulary)))
+            counts[row] = len(names)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.indptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self.counts = counts
+        self._rows = np.repeat(np.arange(len(counts)), counts)
+        self._words = [frozenset(name.split()) for name in self.vocabulary]
+
+    def __len__(self):
+        return len(self.counts)
+
+    def pantry_mask(self, pantry):
+        """
+        Encodes a pantry as a bitset over the ingredient vocabulary.
+
+        A pantry item covers every ingredient whose words include all of its
+        words, so "chicken" covers "chicken breast" but "chicken breast"
+        does not cover "chicken".
+
+        Args:
+            pantry (iterable): Normalized pantry item names.
+
+        Returns:
+            numpy.ndarray: Boolean mask with one entry per vocabulary item.
+        """
+        mask = np.zeros(len(self.vocabulary), dtype=bool)
+        items = [frozenset(item.split()) for item in pantry]
+        for column, words in enumerate(self._words):
+            mask[column] = any(item <= words for item in items)
+        return mask
+
+    def score(self, pantry):
+        """
+        Scores every recipe against a pantry.
+
+        Args:
+            pantry (iterable): Normalized pantry item names.
+
+        Returns:
+            tuple: (matched, missing, coverage) arrays with one entry per
+            recipe; coverage is matched / ingredient count, 0 for recipes
+            without ingredients.
+        """
+        covered = self.pantry_mask(pantry)[self.indices]
+        matched = np.bincount(self._rows, weights=covered, minlength=len(self)).astype(np.int32)
+        missing = self.counts - matched
+        coverage = np.divide(matched, self.counts, out=np.zeros(len(self)), where=self.counts > 0)
+        return matched, missing, coverage
+
+    def rank(self, pantry):
+        """
+        Orders recipes by pantry coverage (highest first), then by fewest
+        missing ingredients. Recipes without ingredients go last; ties keep
+        their original order.
+
+        Returns:
+            tuple: (order, matched, missing, coverage) arrays.
+        """
+        matched, missing, coverage = self.score(pantry)
+        order = np.lexsort((np.arange(len(self)), missing, -coverage, self.counts == 0))
+        return order, matched, missing, coverage
+
+
+def rank_recipes(pantry, recipes, ingredients_for=None, staples=()):
+    """
+    Reranks recipes so the ones using most of the pantry come first.
+
+    Args:
+        pantry (str or list): The ingredients at hand.
+        recipes (list): Search result dicts, recipe details dicts or
+            models.Recipe objects.
+        ingredients_for (callable, optional): Maps a recipe id to its
+            normalized ingredient names, used when the recipe dict itself
+            lists none (e.g. a search made without fillIngredients).
+        staples (iterable): Items assumed to always be at hand, e.g. salt.
+
+    Returns:
+        list: Shallow copies of the recipe dicts (Recipe objects as their
+        to_dict()), reordered, with pantryCoverage (0-1) and pantryMissing
+        (count) added when their ingredients are known.
+    """
+    if not recipes:
+        return []
+    ingredient_sets = []
+    for recipe in recipes:
+        names = recipe_ingredients(recipe)
+        if not names and ingredients_for is not None:
+            recipe_id = recipe.id if isinstance(recipe, Recipe) else recipe.get('id')
+            names = ingredients_for(recipe_id) or frozenset()
+        ingredient_sets.append(names)
+
+    order, _, missing, coverage = IngredientMatrix(ingredient_sets).rank(
+        parse_pantry(pantry) + parse_pantry(list(staples)))
+    ranked = []
+    for row in order:
+        recipe = recipes[row]
+        recipe = recipe.to_dict() if isinstance(recipe, Recipe) else dict(recipe)
+        if ingredient_sets[row]:
+            recipe["pantryCoverage"] = round(float(coverage[row]), 3)
+            recipe["pantryMissing"] = int(missing[row])
+        ranked.append(recipe)
+    return ranked
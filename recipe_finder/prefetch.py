@@ -0,0 +1,126 @@
+# prefetch.py
+
+import threading
+from collections import OrderedDict
+
+from scheduler import LANE_BACKGROUND, LANE_INTERACTIVE
+
+PREFETCH_CHANNEL = "prefetch"
+
+
+class Prefetcher:
+    """
+    Speculatively fetches recipe details on the scheduler's background lane.
+
+    Each prefetch batch is a single background task that fetches every
+    recipe in it with one bulk lookup. Queued prefetches are dropped once a newer batch is queued or the
+    prefetcher is cancelled. Interactive requests are served from the stored
+    results when available, otherwise they run on the interactive lane ahead
+    of every queued prefetch.
+    """
+
+    def __init__(self, scheduler, fetch, fetch_many, max_results=100):
+        """
+        Args:
+            scheduler (TaskScheduler): Scheduler running the fetches.
+            fetch (callable): Function taking a recipe id and returning its
+                details, or None on error.
+            fetch_many (callable): Function taking a list of recipe ids and
+                returning a dict of id -> details; missing ids count as errors.
+            max_results (int): Number of fetched details kept in memory.
+        """
+        self._scheduler = scheduler
+        self._fetch = fetch
+        self._fetch_many = fetch_many
+        self._max_results = max_results
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self._waiters = {}
+        self._in_flight = set()
+
+    def prefetch(self, recipe_ids):
+        """
+        Queues background fetches for the given recipe ids, cancelling any
+        previously queued batch.
+
+        Args:
+            recipe_ids (list): Recipe ids, most relevant first.
+        """
+        self._scheduler.cancel(PREFETCH_CHANNEL)
+        with self._lock:
+            pending = [recipe_id for recipe_id in recipe_ids
+                       if recipe_id not in self._results and recipe_id not in self._in_flight]
+        if pending:
+            self._scheduler.submit(self._fetch_batch, pending,
+                                   channel=PREFETCH_CHANNEL, lane=LANE_BACKGROUND)
+
+    def cancel(self):
+        """Drops every queued background fetch."""
+        self._scheduler.cancel(PREFETCH_CHANNEL)
+
+    def request(self, recipe_id, callback, channel=None):
+        """
+        Requests details for a recipe the user selected. Must be called on
+        the Tk thread.
+
+        The callback runs immediately if the details were already prefetched,
+        otherwise on the Tk thread once they arrive. It is dropped if the
+        channel is cancelled in the meantime.
+
+        Args:
+            recipe_id (int): The ID of the recipe.
+            callback (callable): Called with the details dict, or None on error.
+            channel (str, optional): Scheduler channel the request belongs to.
+        """
+        with self._lock:
+            details = self._results.get(recipe_id)
+            if details is not None:
+                self._results.move_to_end(recipe_id)
+            else:
+                generation = self._scheduler.generation(channel)
+                self._waiters.setdefault(recipe_id, []).append((callback, channel, generation))
+                submit = recipe_id not in self._in_flight
+        if details is not None:
+            callback(details)
+        elif submit:
+            self._scheduler.submit(self._fetch_one, recipe_id, channel=channel,
+                                   lane=LANE_INTERACTIVE)
+
+    def _fetch_one(self, recipe_id):
+        with self._lock:
+            if recipe_id in self._in_flight or recipe_id in self._results:
+                return
+            self._in_flight.add(recipe_id)
+
+        details = None
+        try:
+            details = self._fetch(recipe_id)
+        finally:
+            self._finish(recipe_id, details)
+
+    def _fetch_batch(self, recipe_ids):
+        with self._lock:
+            recipe_ids = [recipe_id for recipe_id in recipe_ids
+                          if recipe_id not in self._in_flight and recipe_id not in self._results]
+            self._in_flight.update(recipe_ids)
+        if not recipe_ids:
+            return
+
+        results = {}
+        try:
+            results = self._fetch_many(recipe_ids) or {}
+        finally:
+            for recipe_id in recipe_ids:
+                self._finish(recipe_id, results.get(recipe_id))
+
+    def _finish(self, recipe_id, details):
+        with self._lock:
+            self._in_flight.discard(recipe_id)
+            if details is not None:
+                self._results[recipe_id] = details
+                while len(self._results) > self._max_results:
+                    self._results.popitem(last=False)
+            waiters = self._waiters.pop(recipe_id, [])
+
+        for callback, channel, generation in waiters:
+            self._scheduler.call_soon(callback, details, channel=channel, generation=generation)
@@ -0,0 +1,184 @@
+# ratelimit.py
+
+import contextlib
+import datetime
+import heapq
+import itertools
+import threading
+import time
+
+import requests
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+_local = threading.local()
+
+
+class QuotaExhaustedError(requests.exceptions.RequestException):
+    """Raised when the daily API point budget has been used up."""
+
+
+@contextlib.contextmanager
+def priority(level):
+    """
+    Sets the rate limiter priority for API calls made by the current thread.
+
+    Args:
+        level (int): PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND.
+    """
+    previous = getattr(_local, "priority", PRIORITY_INTERACTIVE)
+    _local.priority = level
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def current_priority():
+    """Returns the rate limiter priority of the current thread."""
+    return getattr(_local, "priority", PRIORITY_INTERACTIVE)
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for API requests with a daily point budget.
+
+    Requests over the per-second rate wait in a queue instead of failing;
+    interactive requests are granted before background ones. The daily budget
+    is tracked from the quota headers the API returns and resets at midnight
+    UTC, which is when Spoonacular resets its counters.
+    """
+
+    def __init__(self, rate, burst, daily_points):
+        """
+        Args:
+            rate (float): Requests allowed per second.
+            burst (int): Maximum requests allowed at once after an idle period.
+            daily_points (float): Points available per day.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.daily_points = daily_points
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiting = []
+        self._counter = itertools.count()
+        self._day = self._today()
+        self._points_used = 0.0
+        self._points_left = None
+        self._requests = 0
+        self._total_wait = 0.0
+        self._last_wait = 0.0
+
+    def acquire(self, level=None):
+        """
+        Blocks until a request may be sent.
+
+        Args:
+            level (int, optional): Request priority; defaults to the priority
+                of the current thread.
+
+        Returns:
+            float: Seconds spent waiting.
+
+        Raises:
+            QuotaExhaustedError: If no daily points are left.
+        """
+        if level is None:
+            level = current_priority()
+        start = time.monotonic()
+        with self._cond:
+            self._check_quota()
+            ticket = (level, next(self._counter))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiting[0] == ticket and self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    timeout = None
+                    if self._waiting[0] == ticket:
+                        timeout = (1 - self._tokens) / self.rate
+                    self._cond.wait(timeout)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            self._requests += 1
+            self._total_wait += waited
+            self._last_wait = waited
+        return waited
+
+    def record_response(self, headers):
+        """
+        Updates the daily budget from the quota headers of an API response.
+
+        Args:
+            headers (Mapping): Response headers.
+        """
+        with self._cond:
+            self._roll_day()
+            used = _header_float(headers, "X-API-Quota-Used")
+            left = _header_float(headers, "X-API-Quota-Left")
+            if used is None:
+                request_points = _header_float(headers, "X-API-Quota-Request")
+                used = self._points_used + (request_points if request_points is not None else 1)
+            self._points_used = used
+            self._points_left = left
+
+    def stats(self):
+        """
+        Returns:
+            dict: Remaining and used points, queued requests and wait times.
+        """
+        with self._cond:
+            self._roll_day()
+            return {
+                "points_used": self._points_used,
+                "points_remaining": self._remaining(),
+                "queued": len(self._waiting),
+                "requests": self._requests,
+                "last_wait": self._last_wait,
+                "average_wait": self._total_wait / self._requests if self._requests else 0.0,
+            }
+
+    def _remaining(self):
+        if self._points_left is not None:
+            return self._points_left
+        return max(0.0, self.daily_points - self._points_used)
+
+    def _check_quota(self):
+        self._roll_day()
+        if self._remaining() <= 0:
+            raise QuotaExhaustedError("Daily API point budget exhausted")
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _roll_day(self):
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._points_used = 0.0
+            self._points_left = None
+
+    @staticmethod
+    def _today():
+        return datetime.datetime.now(datetime.timezone.utc).date()
+
+
+def _header_float(headers, name):
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
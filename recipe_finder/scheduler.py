@@ -0,0 +1,173 @@
+# scheduler.py
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+import metrics
+
+# Same values as ratelimit.PRIORITY_INTERACTIVE / PRIORITY_BACKGROUND
+LANE_INTERACTIVE = 0
+LANE_BACKGROUND = 1
+
+
+class TaskScheduler:
+    """
+    Runs blocking work on a fixed pool of worker threads for a Tkinter app.
+
+    Tasks are queued in two lanes: interactive tasks always run first, and
+    background tasks never occupy more than ``background_limit`` workers so a
+    worker stays free for user actions. Results are handed back through a
+    queue that a ``root.after`` loop drains on the Tk thread, so callbacks
+    never touch widgets from a worker.
+
+    Tasks can be tagged with a channel. Cancelling a channel bumps its
+    generation: queued tasks from older generations are skipped and their
+    results are dropped, so superseded searches or detail loads never
+    overwrite newer ones.
+
+    API calls made by a task are rate limited at the priority of its lane.
+    """
+
+    def __init__(self, root, workers=4, background_limit=2, poll_interval=30):
+        """
+        Args:
+            root (tk.Tk): The Tk root used for the polling loop.
+            workers (int): Number of worker threads.
+            background_limit (int): Maximum workers running background tasks.
+            poll_interval (int): Milliseconds between result queue drains.
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        self._background_limit = max(1, min(background_limit, workers - 1)) if workers > 1 else 1
+        self._cond = threading.Condition()
+        self._lanes = {LANE_INTERACTIVE: deque(), LANE_BACKGROUND: deque()}
+        self._background_running = 0
+        self._generations = {}
+        self._results = queue.Queue()
+        self._running = True
+
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"scheduler-{i}", daemon=True).start()
+        self.root.after(self.poll_interval, self._poll)
+
+    def submit(self, fn, *args, on_done=None, on_error=None, channel=None, lane=LANE_INTERACTIVE):
+        """
+        Queues ``fn(*args)`` to run on a worker thread.
+
+        Args:
+            fn (callable): The blocking function to run.
+            *args: Positional arguments for ``fn``.
+            on_done (callable, optional): Called on the Tk thread with the result.
+            on_error (callable, optional): Called on the Tk thread with the exception.
+            channel (str, optional): Channel the task belongs to.
+            lane (int): LANE_INTERACTIVE or LANE_BACKGROUND.
+
+        Returns:
+            int: The channel generation the task was queued under.
+        """
+        with self._cond:
+            generation = self._generations.get(channel, 0)
+            self._lanes[lane].append((fn, args, on_done, on_error, channel, generation,
+                                      time.perf_counter()))
+            self._cond.notify()
+        return generation
+
+    def cancel(self, channel):
+        """
+        Supersedes every task and pending result of a channel.
+
+        Returns:
+            int: The new generation of the channel.
+        """
+        with self._cond:
+            generation = self._generations.get(channel, 0) + 1
+            self._generations[channel] = generation
+        return generation
+
+    def generation(self, channel):
+        """Returns the current generation of a channel."""
+        with self._cond:
+            return self._generations.get(channel, 0)
+
+    def is_current(self, channel, generation):
+        """Returns True if the generation has not been superseded."""
+        return channel is None or self.generation(channel) == generation
+
+    def call_soon(self, callback, *args, channel=None, generation=None):
+        """
+        Schedules a callback on the Tk thread. Safe to call from any thread.
+
+        If a channel is given, the callback is dropped when the generation
+        has been superseded by the time it would run.
+        """
+        if generation is None:
+            generation = self.generation(channel)
+        self._results.put((callback, args, channel, generation))
+
+    def shutdown(self):
+        """Stops the workers once their current task finishes."""
+        with self._cond:
+            self._running = False
+            for lane in self._lanes.values():
+                lane.clear()
+            self._cond.notify_all()
+
+    def _next_task(self):
+        with self._cond:
+            while self._running:
+                if self._lanes[LANE_INTERACTIVE]:
+                    return LANE_INTERACTIVE, self._lanes[LANE_INTERACTIVE].popleft()
+                if self._lanes[LANE_BACKGROUND] and self._background_running < self._background_limit:
+                    self._background_running += 1
+                    return LANE_BACKGROUND, self._lanes[LANE_BACKGROUND].popleft()
+                self._cond.wait()
+            return None, None
+
+    def _worker(self):
+        while True:
+            lane, task = self._next_task()
+            if task is None:
+                return
+            fn, args, on_done, on_error, channel, generation, queued_at = task
+            lane_name = "interactive" if lane == LANE_INTERACTIVE else "background"
+            metrics.observe(f"scheduler.queue_wait.{lane_name}", time.perf_counter() - queued_at)
+            try:
+                if not self.is_current(channel, generation):
+                    metrics.incr("scheduler.tasks_superseded")
+                    continue
+                # Imported with the first task, not at thread start: it pulls in
+                # requests, which must stay unloaded until the window is shown.
+                import ratelimit
+                try:
+                    with ratelimit.priority(lane):
+                        result = fn(*args)
+                except Exception as e:
+                    logging.error(f"Error in background task {getattr(fn, '__name__', fn)}: {e}")
+                    if on_error is not None:
+                        self.call_soon(on_error, e, channel=channel, generation=generation)
+                else:
+                    if on_done is not None:
+                        self.call_soon(on_done, result, channel=channel, generation=generation)
+            finally:
+                if lane == LANE_BACKGROUND:
+                    with self._cond:
+                        self._background_running -= 1
+                        self._cond.notify()
+
+    def _poll(self):
+        while True:
+            try:
+                callback, args, channel, generation = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if not self.is_current(channel, generation):
+                continue
+            try:
+                callback(*args)
+            except Exception as e:
+                logging.error(f"Error in scheduler callback: {e}")
+        if self._running:
+            self.root.after(self.poll_interval, self._poll)
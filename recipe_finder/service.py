@@ -0,0 +1,166 @@
+# service.py
+
+import argparse
+import json
+import logging
+import sys
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import config
+import core
+import metrics
+
+
+class RecipeService(ThreadingHTTPServer):
+    """
+    Local HTTP/JSON front end to core, shared by several app instances.
+
+    Every client goes through this process's response cache, connection
+    pool, request coalescer and rate limiter, so identical lookups from
+    different users reach Spoonacular once and the daily quota is spent in
+    one place. The recipe routes mirror Spoonacular's, so an app with
+    SERVICE_URL set uses the service unchanged:
+
+        GET /recipes/complexSearch?query=&cuisine=&diet=&offset=&number=
+        GET /recipes/{id}/information
+        GET /recipes/informationBulk?ids=1,2,3
+        GET /service/nutrition/{id}   nutrient records of one recipe
+        GET /service/stats            cache, quota and latency statistics
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host=config.SERVICE_HOST, port=config.SERVICE_PORT):
+        """
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind; 0 picks a free port.
+        """
+        super().__init__((host, port), _ServiceHandler)
+        self._searches_lock = threading.Lock()
+        self._searches = {}  # search parameters -> Future of the call in flight
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serves requests on a daemon thread and returns the server."""
+        threading.Thread(target=self.serve_forever, name="recipe-service", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def search(self, ingredients, cuisine, diet, offset, number):
+        """
+        Runs a search, sharing the result with identical searches already in flight.
+        """
+        key = (ingredients, cuisine, diet, offset, number)
+        with self._searches_lock:
+            future = self._searches.get(key)
+            owner = future is None
+            if owner:
+                future = self._searches[key] = Future()
+        if not owner:
+            metrics.incr("service.searches_shared")
+            return future.result()
+
+        try:
+            future.set_result(core.search_recipes(ingredients, cuisine, diet, offset=offset, number=number))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._searches_lock:
+                del self._searches[key]
+        return future.result()
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logging.debug(f"Service request: {format % args}")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+
+        try:
+            with metrics.span("service.request"):
+                status, body = self._route(parts, params)
+        except (ValueError, IndexError):
+            status, body = 400, {"status": "failure", "message": "Bad request"}
+        except Exception as e:
+            logging.error(f"Service error handling {url.path}: {e}")
+            status, body = 500, {"status": "failure", "message": "Internal error"}
+        self._send_json(status, body)
+
+    def _route(self, parts, params):
+        if parts[:2] == ["recipes", "complexSearch"]:
+            number = params.get("number")
+            result = self.server.search(params.get("query", ""), params.get("cuisine") or None,
+                                        params.get("diet") or None, int(params.get("offset", 0)),
+                                        int(number) if number else None)
+            return _found(result)
+        if parts[:2] == ["recipes", "informationBulk"]:
+            ids = [int(recipe_id) for recipe_id in params.get("ids", "").split(",") if recipe_id]
+            details = core.get_recipe_details_bulk(ids)
+            return 200, [details[recipe_id].to_dict() for recipe_id in ids if recipe_id in details]
+        if len(parts) == 3 and parts[0] == "recipes" and parts[2] == "information":
+            recipe = core.get_recipe_details_with_nutrition(int(parts[1]))
+            return _found(recipe.to_dict() if recipe is not None else None)
+        if len(parts) == 3 and parts[:2] == ["service", "nutrition"]:
+            nutrition_df = core.analyze_nutrition(core.get_recipe_details_with_nutrition(int(parts[2])))
+            return _found(None if nutrition_df is None else nutrition_df.to_dict(orient="records"))
+        if parts == ["service", "stats"]:
+            return 200, {"cache": core.get_cache_stats(), "quota": core.get_quota_stats(),
+                         "metrics": metrics.snapshot()}
+        return 404, {"status": "failure", "message": "Not found"}
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body, default=str).encode("utf-8")
+        quota = core.get_quota_stats()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        # Clients track the shared quota from the same headers Spoonacular sends
+        self.send_header("X-API-Quota-Used", f"{quota['points_used']:g}")
+        self.send_header("X-API-Quota-Left", f"{quota['points_remaining']:g}")
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def _found(result):
+    if result is None:
+        return 502, {"status": "failure", "message": "Upstream request failed"}
+    return 200, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Serve recipe search and nutrition over a local HTTP/JSON API.")
+    parser.add_argument("--host", default=config.SERVICE_HOST, help="interface to bind")
+    parser.add_argument("--port", type=int, default=config.SERVICE_PORT, help="port to bind")
+    args = parser.parse_args(argv)
+
+    server = RecipeService(args.host, args.port)
+    print(f"Serving recipe_finder at {server.base_url} "
+          f"(set SERVICE_URL in config.py on the clients to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
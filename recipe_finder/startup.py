@@ -0,0 +1,65 @@
+# startup.py
+
+import importlib
+import logging
+import sys
+import time
+
+# Heavy modules loaded after the window is shown, in the order they are needed
+WARMUP_MODULES = ["requests", "core", "pandas", "matplotlib", "viz", "PIL.Image", "PIL.ImageTk"]
+
+
+class StartupProfiler:
+    """
+    Records how long each startup phase takes, relative to process launch.
+    """
+
+    def __init__(self, started):
+        """
+        Args:
+            started (float): time.perf_counter() value taken when main.py
+                began importing.
+        """
+        self.started = started
+        self.phases = []
+        self.imports = []
+
+    def mark(self, phase):
+        """Records that a startup phase has just finished."""
+        self.phases.append((phase, time.perf_counter() - self.started))
+
+    def record_import(self, module, seconds):
+        self.imports.append((module, seconds))
+
+    def report(self):
+        """
+        Returns:
+            str: A table of phase timestamps and background import costs.
+        """
+        lines = ["Startup profile (ms since main.py started)"]
+        lines += [f"  {phase:<32}{elapsed * 1000:9.1f}" for phase, elapsed in self.phases]
+        if self.imports:
+            lines.append("Background warm-up imports (ms each)")
+            lines += [f"  {module:<32}{seconds * 1000:9.1f}" for module, seconds in self.imports]
+        return "\n".join(lines)
+
+
+def warm_up(profiler=None):
+    """
+    Imports the heavy modules so the first search and recipe view don't pay
+    for them. Meant to run on a background thread after the first paint.
+
+    Args:
+        profiler (StartupProfiler, optional): Receives per-module import times.
+    """
+    for module in WARMUP_MODULES:
+        if module in sys.modules:
+            continue
+        start = time.perf_counter()
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logging.error(f"Error warming up {module}: {e}")
+            continue
+        if profiler is not None:
+            profiler.record_import(module, time.perf_counter() - start)
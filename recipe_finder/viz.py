@@ -1,44 +1,155 @@
 # viz.py
 
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import tkinter as tk
 import pandas as pd
 import logging
+import metrics
+
+
+class _TimedTkCanvas(FigureCanvasTkAgg):
+    # draw_idle() runs draw() later on the Tk thread; time it there
+    def draw(self):
+        with metrics.span("viz.chart_draw"):
+            super().draw()
+
+
+class NutritionChart:
+    """
+    A nutrition bar chart embedded in a Tkinter frame.
+
+    The figure, canvas and bar artists are created once; each update only
+    changes bar widths, labels and axis limits and schedules a redraw. The
+    figure is not registered with pyplot, so nothing accumulates when charts
+    are replaced. Without a master the chart renders off-screen, which is
+    how the benchmarks exercise it.
+    """
+
+    MAX_BARS = 8
+
+    def __init__(self, master):
+        """
+        Args:
+            master (tk.Frame): The Tkinter frame to embed the chart into, or
+                None to render off-screen.
+        """
+        self.figure = Figure(figsize=(6, 5), facecolor="#f0f0f0")
+        self.ax = self.figure.add_subplot(111)
+        if master is None:
+            self.frame = None
+            self.canvas = FigureCanvasAgg(self.figure)
+        else:
+            self.frame = tk.Frame(master)
+            self.frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
+            self.canvas = _TimedTkCanvas(self.figure, master=self.frame)
+            self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+        positions = range(self.MAX_BARS)
+        self._bars = list(self.ax.barh(positions, [0] * self.MAX_BARS, color="#2ecc71"))
+        self._value_labels = [self.ax.text(0, y, "", va='center', fontsize=9) for y in positions]
+        self._message = self.ax.text(0.5, 0.5, "", transform=self.ax.transAxes,
+                                     ha='center', va='center', fontsize=12, color="#777777")
+
+        self.ax.set_title("Key Nutrients", fontsize=14, fontweight='bold', color="#333333")
+        self.ax.set_xlabel("Amount", fontsize=10, color="#555555")
+        self.ax.set_ylabel("Nutrients", fontsize=10, color="#555555")
+        self.ax.tick_params(axis='y', labelsize=9)
+        self.ax.tick_params(axis='x', labelsize=9)
+        self.ax.grid(axis='x', linestyle='--', alpha=0.7)
+        self.ax.spines['top'].set_visible(False)
+        self.ax.spines['right'].set_visible(False)
+
+    def update(self, nutrition_df):
+        """
+        Redraws the chart for a new recipe's nutritional data.
+
+        Args:
+            nutrition_df (pd.DataFrame): DataFrame containing nutritional information.
+        """
+        try:
+            with metrics.span("viz.chart_update"):
+                self._update_artists(nutrition_df)
+        except Exception as e:
+            logging.error(f"Error plotting nutrition data: {e}")
+            self._show_message("Error plotting data", color="red")
+
+        if self.frame is None:
+            with metrics.span("viz.chart_draw"):
+                self.canvas.draw()
+        else:
+            self.canvas.draw_idle()
+
+    def _update_artists(self, nutrition_df):
+        if nutrition_df is None or nutrition_df.empty:
+            self._show_message("Nutritional data not available")
+        elif 'amount' not in nutrition_df.columns:
+            self._show_message("Invalid nutrition data format", color="red")
+        else:
+            top_nutrients = _top_nutrients(nutrition_df, self.MAX_BARS)
+            if top_nutrients:
+                self._show_bars(top_nutrients)
+            else:
+                self._show_message("No significant nutrient data available")
+
+    def destroy(self):
+        """Removes the chart from its parent frame."""
+        if self.frame is not None:
+            self.frame.destroy()
+
+    def _show_bars(self, top_nutrients):
+        max_amount = max(amount for _, amount, _ in top_nutrients)
+        for i, (bar, label) in enumerate(zip(self._bars, self._value_labels)):
+            if i < len(top_nutrients):
+                _, amount, display_value = top_nutrients[i]
+                bar.set_width(amount)
+                bar.set_visible(True)
+                label.set_position((amount + max_amount * 0.02, i))
+                label.set_text(display_value)
+                label.set_visible(True)
+            else:
+                bar.set_visible(False)
+                label.set_visible(False)
+
+        self.ax.set_yticks(range(len(top_nutrients)))
+        self.ax.set_yticklabels([name for name, _, _ in top_nutrients])
+        self.ax.set_ylim(-0.5, len(top_nutrients) - 0.5)
+        self.ax.set_xlim(0, max_amount * 1.15)
+        self.ax.xaxis.set_visible(True)
+        self._message.set_visible(False)
+
+    def _show_message(self, text, color="#777777"):
+        for bar, label in zip(self._bars, self._value_labels):
+            bar.set_visible(False)
+            label.set_visible(False)
+        self.ax.set_yticks([])
+        self.ax.xaxis.set_visible(False)
+        self._message.set_text(text)
+        self._message.set_color(color)
+        self._message.set_visible(True)
+
 
 def create_nutrition_chart(master, nutrition_df):
     """
     Creates and embeds a Matplotlib bar chart for nutritional data into a Tkinter frame.
 
+    Keep the returned chart and call its update() method for later recipes
+    instead of creating a new chart each time.
+
     Args:
         master (tk.Frame): The Tkinter frame to embed the chart into.
         nutrition_df (pd.DataFrame): DataFrame containing nutritional information.
 
     Returns:
-        FigureCanvasTkAgg: The Matplotlib canvas containing the chart.
+        NutritionChart: The chart, or None on error.
     """
     try:
-        # Create a new frame specifically for the chart
-        chart_frame = tk.Frame(master)
-        chart_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # Create figure and canvas
-        nutrition_figure, nutrition_ax = plt.subplots(figsize=(6, 5), facecolor="#f0f0f0")
-        nutrition_canvas = FigureCanvasTkAgg(nutrition_figure, master=chart_frame)
-        nutrition_canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-
-        if nutrition_df is not None and not nutrition_df.empty:
-            _plot_nutrition_data(nutrition_ax, nutrition_df)
-        else:
-            nutrition_ax.clear()
-            nutrition_ax.text(0.5, 0.5, "Nutritional data not available", ha='center', va='center', fontsize=12, color="#777777")
-        
-        # This is critical - need to draw the canvas to make it appear
-        nutrition_canvas.draw()
-        
+        chart = NutritionChart(master)
+        chart.update(nutrition_df)
         logging.info("Nutrition chart created successfully")
-        return nutrition_canvas
-    
+        return chart
+
     except Exception as e:
         logging.error(f"Error creating nutrition chart: {e}")
         # Create a simple error message if chart creation fails
@@ -49,64 +160,25 @@ def create_nutrition_chart(master, nutrition_df):
         return None
 
 
-def _plot_nutrition_data(ax, nutrition_df):
+def _top_nutrients(nutrition_df, count):
     """
-    Plots the nutritional data on the provided Matplotlib axes.
+    Selects the nutrients with the largest amounts for plotting.
 
     Args:
-        ax (matplotlib.axes._subplots.AxesSubplot): The Matplotlib axes to plot on.
         nutrition_df (pd.DataFrame): DataFrame containing nutritional information.
+        count (int): Maximum number of nutrients to return.
+
+    Returns:
+        list: (name, amount, display value) tuples, largest amount first.
     """
-    try:
-        ax.clear()
-        
-        # Filter for common important nutrients and ensure we have amount and unit columns
-        if 'amount' not in nutrition_df.columns or nutrition_df.empty:
-            ax.text(0.5, 0.5, "Invalid nutrition data format", ha='center', va='center', fontsize=12, color="red")
-            return
-            
-        # Get the top nutrients by amount
-        # Select only nutrients with meaningful amounts (> 0)
-        valid_df = nutrition_df[nutrition_df['amount'] > 0]
-        
-        # If we have units, combine with amount for display
-        if 'unit' in nutrition_df.columns:
-            valid_df['display_value'] = valid_df['amount'].round(1).astype(str) + ' ' + valid_df['unit']
-        else:
-            valid_df['display_value'] = valid_df['amount'].round(1).astype(str)
-            
-        # Select top nutrients for plotting
-        top_nutrients = valid_df.nlargest(8, 'amount')
-        
-        if len(top_nutrients) > 0:
-            nutrients = top_nutrients['name']
-            amounts = top_nutrients['amount']
-            
-            # Create horizontal bar chart for better readability
-            bars = ax.barh(nutrients, amounts, color="#2ecc71")
-            
-            # Add value labels to the end of each bar
-            for i, bar in enumerate(bars):
-                value = top_nutrients['display_value'].iloc[i]
-                ax.text(bar.get_width() + (max(amounts) * 0.02), 
-                        bar.get_y() + bar.get_height()/2, 
-                        value, 
-                        va='center',
-                        fontsize=9)
-                
-            ax.set_title("Key Nutrients", fontsize=14, fontweight='bold', color="#333333")
-            ax.set_xlabel("Amount", fontsize=10, color="#555555")
-            ax.set_ylabel("Nutrients", fontsize=10, color="#555555")
-            ax.tick_params(axis='y', labelsize=9)
-            ax.tick_params(axis='x', labelsize=9)
-            ax.grid(axis='x', linestyle='--', alpha=0.7)
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-        else:
-            ax.text(0.5, 0.5, "No significant nutrient data available", 
-                    ha='center', va='center', fontsize=12, color="#777777")
-    
-    except Exception as e:
-        logging.error(f"Error plotting nutrition data: {e}")
-        ax.clear()
-        ax.text(0.5, 0.5, f"Error plotting data", ha='center', va='center', fontsize=12, color="red")
\ No newline at end of file
+    # Select only nutrients with meaningful amounts (> 0)
+    valid_df = nutrition_df[nutrition_df['amount'] > 0]
+    top_df = valid_df.nlargest(count, 'amount')
+
+    top_nutrients = []
+    has_unit = 'unit' in top_df.columns
+    for row in top_df.itertuples(index=False):
+        amount = float(row.amount)
+        display_value = f"{round(amount, 1)} {row.unit}" if has_unit else str(round(amount, 1))
+        top_nutrients.append((row.name, amount, display_value))
+    return top_nutrients
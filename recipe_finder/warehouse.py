@@ -0,0 +1,305 @@
+# warehouse.py
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from file_lock import locked
+from models import as_recipe
+from nutrition import NutritionMatrix, normalize_unit
+
+_DICTIONARY_FILE = "nutrients.json"
+_LOCK_FILE = "store.lock"
+_IDS_FILE = "recipe_id.i8"
+_SERVINGS_FILE = "servings.f8"
+
+
+class NutritionStore:
+    """
+    Append-only columnar store of per-serving nutrient amounts.
+
+    Each nutrient is one file of little-endian float64 values in base units
+    (NaN where a recipe doesn't report it), next to a recipe id column, a
+    servings column and a JSON dictionary of nutrient names, units, column
+    files and the committed row count. Appends are buffered and written at
+    most every ``flush_interval`` seconds or ``flush_rows`` recipes and at
+    exit; readers memory-map only the columns they ask for and only the
+    committed rows, so a crash mid-append leaves the store readable.
+
+    Several processes (app instances and the service) can share a store:
+    writes take an exclusive lock on the directory's lock file and first pick
+    up the rows and nutrients other processes committed.
+    """
+
+    def __init__(self, path, flush_rows=64, flush_interval=5.0):
+        """
+        Args:
+            path (str): Directory holding the column files.
+            flush_rows (int): Buffered recipes that trigger a write.
+            flush_interval (float): Maximum seconds a recipe stays buffered
+                while further recipes arrive.
+        """
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._rows = 0
+        self._nutrients = {}  # name -> {"file", "unit", "daily_value"}; file is None until written
+        self._ids = set()
+        self._pending = []  # (recipe id, servings, {name: amount}) not yet written
+        self._last_flush = time.monotonic()
+        self._load()
+        atexit.register(self.flush)
+
+    def __len__(self):
+        with self._lock:
+            return self._rows + len(self._pending)
+
+    def __contains__(self, recipe_id):
+        return recipe_id in self._ids
+
+    def nutrients(self):
+        """
+        Returns:
+            dict: Nutrient name -> base unit, for every stored nutrient.
+        """
+        with self._lock:
+            return {name: entry["unit"] for name, entry in self._nutrients.items()}
+
+    def append(self, details):
+        """
+        Adds the nutrition of one recipe, unless it is already stored.
+
+        Args:
+            details (models.Recipe or dict): The recipe or its API details.
+
+        Returns:
+            bool: True if the recipe was added.
+        """
+        recipe = as_recipe(details)
+        if not recipe or recipe.id is None or not recipe.nutrient_names:
+            return False
+        recipe_id = recipe.id
+
+        amounts = {}
+        with self._lock:
+            if recipe_id in self._ids:
+                return False
+            for name, unit, amount, percent in zip(recipe.nutrient_names, recipe.nutrient_units,
+                                                   recipe.nutrient_amounts, recipe.nutrient_percents):
+                base_unit, factor = normalize_unit(unit)
+                amount *= factor
+                entry = self._nutrients.get(name)
+                if entry is None:
+                    # Files are named at flush time, under the lock, so processes don't collide
+                    entry = self._nutrients[name] = {"file": None, "unit": base_unit, "daily_value": None}
+                elif entry["unit"] != base_unit:
+                    logging.warning(f"Skipping {name} for recipe {recipe_id}: unit "
+                                    f"{unit} is not convertible to {entry['unit']}")
+                    continue
+                if entry["daily_value"] is None and percent > 0:
+                    entry["daily_value"] = amount * 100 / percent
+                amounts[name] = amount
+            self._ids.add(recipe_id)
+            self._pending.append((recipe_id, float(recipe.servings), amounts))
+            due = (len(self._pending) >= self.flush_rows
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+
+        if due:
+            self.flush()
+        return True
+
+    def flush(self):
+        """
+        Writes buffered recipes to the column files and commits them.
+
+        Recipes another process committed in the meantime are not written
+        again, and their rows become visible to this store's readers.
+        """
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                try:
+                    self._refresh()
+                except (OSError, ValueError, KeyError) as e:
+                    logging.error(f"Error reading nutrition store: {e}")
+                return
+            pending = []
+            try:
+                os.makedirs(self.path, exist_ok=True)
+                with locked(os.path.join(self.path, _LOCK_FILE)):
+                    self._refresh()
+                    pending, self._pending = self._pending, []
+                    if not pending:
+                        return
+                    self._name_files()
+                    self._append_column(_IDS_FILE, np.array([row[0] for row in pending], dtype="<i8"))
+                    self._append_column(_SERVINGS_FILE, np.array([row[1] for row in pending], dtype="<f8"))
+                    for name, entry in self._nutrients.items():
+                        column = np.array([row[2].get(name, np.nan) for row in pending], dtype="<f8")
+                        self._append_column(entry["file"], column)
+                    self._rows += len(pending)
+                    self._write_dictionary()
+            except (OSError, ValueError, KeyError) as e:
+                logging.error(f"Error writing nutrition store: {e}")
+                self._pending = pending + self._pending
+
+    def recipe_ids(self):
+        """
+        Returns:
+            numpy.ndarray: Memory-mapped recipe ids of the committed rows.
+        """
+        self.flush()
+        with self._lock:
+            return self._map(_IDS_FILE, "<i8")
+
+    def column(self, nutrient):
+        """
+        Returns the per-serving amounts of one nutrient for every stored
+        recipe, memory-mapped so only the pages that are read get loaded.
+
+        Raises:
+            KeyError: If no stored recipe reported the nutrient.
+        """
+        self.flush()
+        with self._lock:
+            return self._map(self._nutrients[nutrient]["file"], "<f8")
+
+    def select(self, nutrients, recipe_ids=None):
+        """
+        Reads some nutrient columns, optionally for some recipes only.
+
+        Args:
+            nutrients (list): Nutrient names.
+            recipe_ids (list, optional): Recipes to keep; all by default.
+                Recipes that are not stored are ignored.
+
+        Returns:
+            tuple: (recipe ids array, {nutrient name: amounts array}).
+        """
+        with self._lock:
+            ids, rows = self._select_rows(recipe_ids)
+            return ids, {name: np.asarray(self.column(name)[rows]) for name in nutrients}
+
+    def top_k(self, nutrient, k=5):
+        """
+        Returns:
+            list: (recipe id, amount) tuples with the most of a nutrient, largest first.
+        """
+        column = np.nan_to_num(self.column(nutrient), nan=-np.inf)
+        k = min(k, len(column))
+        if k <= 0:
+            return []
+        top = np.argpartition(column, -k)[-k:]
+        top = top[np.argsort(column[top])[::-1]]
+        ids = self.recipe_ids()
+        return [(int(ids[i]), float(column[i])) for i in top if np.isfinite(column[i])]
+
+    def to_matrix(self, nutrients=None, recipe_ids=None):
+        """
+        Loads part of the store as a NutritionMatrix for the analyses in
+        nutrition.py. Titles are not stored and come back empty.
+
+        Args:
+            nutrients (list, optional): Nutrient names; all by default.
+            recipe_ids (list, optional): Recipes to keep; all by default.
+
+        Returns:
+            nutrition.NutritionMatrix: The selected recipes and nutrients.
+        """
+        with self._lock:
+            ids, rows = self._select_rows(recipe_ids)
+            names = list(self._nutrients) if nutrients is None else list(nutrients)
+            entries = [self._nutrients[name] for name in names]
+            columns = [np.asarray(self._map(entry["file"], "<f8")[rows]) for entry in entries]
+            servings = np.asarray(self._map(_SERVINGS_FILE, "<f8")[rows])
+        values = np.column_stack(columns) if columns else np.empty((len(ids), 0))
+        daily_values = np.array([entry["daily_value"] or np.nan for entry in entries], dtype=float)
+        return NutritionMatrix(ids.tolist(), [""] * len(ids), names, [entry["unit"] for entry in entries],
+                               values, daily_values, servings)
+
+    def _select_rows(self, recipe_ids):
+        ids = self.recipe_ids()
+        if recipe_ids is None:
+            return np.asarray(ids), slice(None)
+        rows = np.flatnonzero(np.isin(ids, list(recipe_ids)))
+        return np.asarray(ids[rows]), rows
+
+    def _append_column(self, filename, values):
+        path = os.path.join(self.path, filename)
+        committed = self._rows * values.itemsize
+        with open(path, "ab") as f:
+            size = f.tell()
+            if size > committed:
+                f.truncate(committed)  # Drop rows from an append that was never committed
+            elif size < committed:
+                # A nutrient seen for the first time: earlier recipes don't have it
+                f.write(np.full((committed - size) // values.itemsize, np.nan, dtype=values.dtype).tobytes())
+            f.write(values.tobytes())
+
+    def _write_dictionary(self):
+        state = {"rows": self._rows, "nutrients": self._nutrients}
+        tmp_path = os.path.join(self.path, f"{_DICTIONARY_FILE}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, os.path.join(self.path, _DICTIONARY_FILE))
+
+    def _map(self, filename, dtype):
+        if not self._rows:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, filename), dtype=dtype, mode="r", shape=(self._rows,))
+
+    def _refresh(self):
+        """
+        Merges in the committed state of the store on disk, which other
+        processes may have extended since it was last read.
+        """
+        path = os.path.join(self.path, _DICTIONARY_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        rows, nutrients = state["rows"], state["nutrients"]
+
+        for name, entry in self._nutrients.items():
+            stored = nutrients.get(name)
+            if stored is None:
+                entry["file"] = None
+                nutrients[name] = entry
+            elif stored["unit"] != entry["unit"]:
+                logging.warning(f"Dropping buffered {name}: unit {entry['unit']} does not match "
+                                f"the stored {stored['unit']}")
+                for row in self._pending:
+                    row[2].pop(name, None)
+            elif stored["daily_value"] is None:
+                stored["daily_value"] = entry["daily_value"]
+
+        previous_rows, self._rows, self._nutrients = self._rows, rows, nutrients
+        if rows > previous_rows:
+            added = set(self._map(_IDS_FILE, "<i8")[previous_rows:].tolist())
+            self._ids |= added
+            self._pending = [row for row in self._pending if row[0] not in added]
+
+    def _name_files(self):
+        used = {entry["file"] for entry in self._nutrients.values()}
+        number = 0
+        for entry in self._nutrients.values():
+            if entry["file"] is None:
+                while f"n{number:04d}.f8" in used:
+                    number += 1
+                entry["file"] = f"n{number:04d}.f8"
+                used.add(entry["file"])
+
+    def _load(self):
+        try:
+            self._refresh()
+            if self._rows:
+                logging.info(f"Loaded nutrition store with {self._rows} recipes")
+        except (OSError, ValueError, KeyError) as e:
+            logging.error(f"Error loading nutrition store, starting empty: {e}")
+            self._rows, self._nutrients, self._ids = 0, {}, set()